@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class ActiveSet:
+    """
+    The people who can still make friends today: anyone with interactions left who isn't at their max friends.
+    People are only ever removed during a day, in O(1) by swapping them with the last member, so the members stay
+    packed at the start of an array.
+
+    num_people - the number of people in the simulation
+    people - the ids of everyone who starts out active
+
+    members - members[:size] are the ids of everyone active, in no particular order (see ids)
+    positions - positions[i] is where person i is in members, or -1 if they aren't active
+    """
+
+    def __init__(self, num_people, people):
+        self.num_people = num_people
+        self.size = len(people)
+
+        self.members = np.empty(num_people, dtype=np.int64)
+        self.members[:self.size] = people
+        self.positions = np.full(num_people, -1, dtype=np.int64)
+        self.positions[self.members[:self.size]] = np.arange(self.size)
+
+    # The ids of everyone active
+    @property
+    def ids(self):
+        return self.members[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, person):
+        return self.positions[person] >= 0
+
+    # Returns whether each person in people is active, as a boolean array
+    def contains_batch(self, people):
+        return self.positions[people] >= 0
+
+    # Removes person if they are active, by moving the last member into their place
+    def remove(self, person):
+        position = self.positions[person]
+        if position < 0:
+            return
+
+        self.size -= 1
+        last = self.members[self.size]
+        self.members[position] = last
+        self.positions[last] = position
+        self.positions[person] = -1
+
+    # Removes everyone in people who is active
+    def remove_batch(self, people):
+        for person in np.unique(people[self.contains_batch(people)]).tolist():
+            self.remove(person)
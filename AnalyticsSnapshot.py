@@ -0,0 +1,112 @@
+import numpy as np
+
+from Person import Person
+from FriendshipGraph import FriendshipGraph
+from FriendGroups import FriendGroups
+
+
+class AnalyticsSnapshot:
+    """
+    Everything the analytics need about the friendships on one day, built once and shared by every metric so none of
+    them has to rebuild the graph or rescan everyone. Anything more expensive than the degrees is only built the first
+    time a metric asks for it, and then kept for the rest of the day.
+
+    simulation - the Simulation this is a snapshot of
+    day - the day (starting at 0) the snapshot was taken on
+    friendship_graph, friend_groups - the friendships and friend groups of that day. Left out, the simulation's current
+                                      ones are used. For an earlier day, see replay_snapshots
+
+    separation_tracker - the simulation's SeparationTracker, only for the current friendships (None otherwise)
+
+    degree - degree[i] is the number of friends person i has
+    loner_mask - loner_mask[i] is True if person i has no friends
+    num_friendships - the total number of friendships
+    num_friend_groups - the number of friend groups (of two or more people)
+    avg_friend_group_size - the average number of people in each friend group
+
+    Built when first used:
+        csr - the compressed (indptr, indices) adjacency, see FriendshipGraph.to_csr
+        largest_group - the sorted ids of everyone in the largest friend group
+        group_roots - group_roots[i] is the representative person of person i's friend group
+        graph - a networkx Graph of the friendships (without loners), for metrics that want networkx
+
+    The lazy parts are read from the friendship graph when they are built, so the snapshot should be used before any
+    more friendships are made.
+    """
+
+    def __init__(self, simulation, day=None, friendship_graph=None, friend_groups=None):
+        self.simulation = simulation
+        self.day = day
+
+        self.is_current = friendship_graph is None
+        self.friendship_graph = simulation.friendship_graph if self.is_current else friendship_graph
+        self.friend_groups = simulation.friend_groups if self.is_current else friend_groups
+        self.separation_tracker = simulation.separation_tracker if self.is_current else None
+
+        self.degree = self.friendship_graph.degree.copy()
+        self.loner_mask = self.degree == 0
+        self.num_friendships = self.friendship_graph.num_edges
+        self.num_friend_groups = self.friend_groups.num_groups
+        self.avg_friend_group_size = self.friend_groups.avg_group_size
+
+        # Derived structures, built by get_cached the first time they are needed
+        self.__cache = dict()
+
+    # Returns the structure stored under name, calling build(snapshot) to make it the first time
+    # Plugins can use this to share their own derived structures, see simulation_analysis_funcs.register_analytics_plugin
+    def get_cached(self, name, build):
+        if name not in self.__cache:
+            self.__cache[name] = build(self)
+
+        return self.__cache[name]
+
+    @property
+    def csr(self):
+        return self.get_cached("csr", lambda snapshot: snapshot.friendship_graph.to_csr())
+
+    @property
+    def largest_group(self):
+        return self.get_cached("largest_group", lambda snapshot: snapshot.friend_groups.largest_group())
+
+    @property
+    def group_roots(self):
+        return self.get_cached("group_roots", lambda snapshot: snapshot.friend_groups.roots())
+
+    @property
+    def graph(self):
+        return self.get_cached("graph", lambda snapshot: snapshot.friendship_graph.to_networkx())
+
+    # The ids of everyone with no friends
+    @property
+    def loner_ids(self):
+        return self.get_cached("loner_ids", lambda snapshot: np.flatnonzero(snapshot.loner_mask))
+
+    # The ids of everyone with at least one friend
+    @property
+    def non_loner_ids(self):
+        return self.get_cached("non_loner_ids", lambda snapshot: np.flatnonzero(~snapshot.loner_mask))
+
+    # Returns the Person view of person_id, with their friends as of the snapshot's day
+    def person(self, person_id):
+        if self.is_current:
+            return self.simulation.people[person_id]
+
+        return Person(self.simulation.population, person_id, self.friendship_graph)
+
+
+# Yields an AnalyticsSnapshot for each of the given (earlier) days in increasing order, rebuilt by replaying the
+#   simulation's friendships up to the end of that day. The friendships are replayed once for all the days
+# Each snapshot is only valid until the next one is yielded
+def replay_snapshots(simulation, days):
+    friendship_graph = FriendshipGraph(simulation.num_people, simulation.max_friends)
+    friend_groups = FriendGroups(simulation.num_people)
+    edges = simulation.friendship_graph.edges
+
+    for day in sorted(days):
+        num_edges = simulation.day_num_edges[day]
+
+        for person_1, person_2 in edges[friendship_graph.num_edges:num_edges].tolist():
+            friendship_graph.add_friendship(person_1, person_2)
+            friend_groups.add_friendship(person_1, person_2)
+
+        yield AnalyticsSnapshot(simulation, day, friendship_graph, friend_groups)
@@ -0,0 +1,115 @@
+import numpy as np
+
+from Population import count_bits
+
+
+class CompatibilityIndex:
+    """
+    Precomputed answer to "do these two people like each other enough to be friends?" for every pair.
+
+    Two people are compatible when like_scores[i][j] >= friend_threshold[i] and like_scores[j][i] >= friend_threshold[j].
+    Neither the like scores nor the thresholds change after the simulation is created, so we work this out once and
+    store it as one bit per pair, 64 times smaller than the float64 like scores.
+
+    like_scores - the LikeScores of everyone, see LikeScores.py
+    friend_threshold - array of everyone's friend threshold
+    block_size - how many rows are worked out at a time, which bounds the extra memory used while building
+
+    bits - (num_people x ceil(num_people / 8)) packed bits, bit j of row i is set if i and j are compatible
+    num_compatible - num_compatible[i] is how many people person i is compatible with
+    """
+
+    def __init__(self, like_scores, friend_threshold, block_size=1024):
+        num_people = len(friend_threshold)
+        self.num_people = num_people
+
+        self.bits = np.zeros((num_people, (num_people + 7) // 8), dtype=np.uint8)
+        self.num_compatible = np.zeros(num_people, dtype=np.int64)
+
+        for start in range(0, num_people, block_size):
+            stop = min(start + block_size, num_people)
+
+            # Rows start:stop like everyone else enough, and everyone else likes rows start:stop enough
+            likes = like_scores.rows(start, stop) >= friend_threshold[start:stop, None]
+            liked_back = like_scores.columns(start, stop).T >= friend_threshold[None, :]
+            compatible = likes & liked_back
+
+            self.bits[start:stop] = np.packbits(compatible, axis=1)
+            self.num_compatible[start:stop] = compatible.sum(axis=1)
+
+    # Creates a CompatibilityIndex from the bits and num_compatible of another one, without the like scores
+    @classmethod
+    def from_bits(cls, bits, num_compatible):
+        compatibility = cls.__new__(cls)
+        compatibility.num_people = len(num_compatible)
+        compatibility.bits = bits
+        compatibility.num_compatible = num_compatible
+
+        return compatibility
+
+    # Returns whether person_1 and person_2 are compatible
+    def are_compatible(self, person_1, person_2):
+        return bool((self.bits[person_1, person_2 >> 3] >> (7 - (person_2 & 7))) & 1)
+
+    # Returns whether each pair (people_1[k], people_2[k]) is compatible, as a boolean array
+    def are_compatible_batch(self, people_1, people_2):
+        return ((self.bits[people_1, people_2 >> 3] >> (7 - (people_2 & 7))) & 1).astype(bool)
+
+    # Returns the (len(people) x num_people) boolean matrix of who each person in people is compatible with
+    def compatible_rows(self, people):
+        return np.unpackbits(self.bits[people], axis=1, count=self.num_people).astype(bool)
+
+    # Returns the number of pairs (person_1, person_2) of people in the id array people who are compatible, counting
+    #   each pair in both directions
+    def count_compatible_pairs(self, people, block_size=1024):
+        in_people = np.zeros(self.bits.shape[1] * 8, dtype=bool)
+        in_people[people] = True
+        packed_people = np.packbits(in_people)
+
+        num_pairs = 0
+        for start in range(0, len(people), block_size):
+            num_pairs += int(count_bits(self.bits[people[start:start + block_size]] & packed_people).sum())
+
+        return num_pairs
+
+
+class ImplicitCompatibility:
+    """
+    Answers the same questions as CompatibilityIndex, but reads the like scores every time instead of storing a bit per
+    pair, so it uses no memory of its own. Meant for ImplicitLikeScores (see ImplicitLikeScores.py), where the like
+    scores are cheap to work out and there are too many people for an O(N^2) index.
+
+    like_scores - the like scores of everyone, anything with get and get_batch like LikeScores
+    friend_threshold - array of everyone's friend threshold
+    """
+
+    def __init__(self, like_scores, friend_threshold):
+        self.num_people = len(friend_threshold)
+        self.like_scores = like_scores
+        self.friend_threshold = friend_threshold
+
+    # Returns whether person_1 and person_2 are compatible
+    def are_compatible(self, person_1, person_2):
+        return self.like_scores.get(person_1, person_2) >= self.friend_threshold[person_1] and \
+            self.like_scores.get(person_2, person_1) >= self.friend_threshold[person_2]
+
+    # Returns whether each pair (people_1[k], people_2[k]) is compatible, as a boolean array
+    def are_compatible_batch(self, people_1, people_2):
+        return (self.like_scores.get_batch(people_1, people_2) >= self.friend_threshold[people_1]) & \
+            (self.like_scores.get_batch(people_2, people_1) >= self.friend_threshold[people_2])
+
+    # Returns the (len(people) x num_people) boolean matrix of who each person in people is compatible with
+    def compatible_rows(self, people):
+        people = np.asarray(people)[:, None]
+        everyone = np.arange(self.num_people)[None, :]
+
+        return self.are_compatible_batch(people, everyone)
+
+    # Returns the number of pairs (person_1, person_2) of people in the id array people who are compatible, counting
+    #   each pair in both directions
+    def count_compatible_pairs(self, people, block_size=1024):
+        num_pairs = 0
+        for start in range(0, len(people), block_size):
+            num_pairs += int(self.are_compatible_batch(people[start:start + block_size, None], people[None, :]).sum())
+
+        return num_pairs
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class FriendGroups:
+    """
+    Keeps track of the friend groups (connected components of two or more people) as friendships are made, using a
+    union-find with group sizes. Friendships are never removed, so each new friendship can only merge two groups and
+    every statistic below is kept up to date in O(α(num_people)) per friendship.
+
+    num_people - the number of people in the simulation
+
+    num_groups - the number of friend groups
+    num_people_in_groups - how many people have at least one friend
+    largest_group_size - the number of people in the largest friend group
+    """
+
+    def __init__(self, num_people):
+        self.parent = np.arange(num_people, dtype=np.int64)
+        self.size = np.ones(num_people, dtype=np.int64)
+
+        self.num_groups = 0
+        self.num_people_in_groups = 0
+        self.largest_group_size = 0
+
+        # Some person in the largest group. If several groups are the largest, it's the first to reach that size
+        self.__largest_group_member = -1
+
+    # Returns the representative (root) person of person_idx's group
+    def find(self, person_idx):
+        parent = self.parent
+
+        while parent[person_idx] != person_idx:
+            # Path halving, point everyone we pass at their grandparent
+            parent[person_idx] = parent[parent[person_idx]]
+            person_idx = parent[person_idx]
+
+        return person_idx
+
+    # Records a friendship between person_1 and person_2, merging their groups
+    def add_friendship(self, person_1, person_2):
+        root_1 = self.find(person_1)
+        root_2 = self.find(person_2)
+        if root_1 == root_2:
+            return
+
+        size_1 = int(self.size[root_1])
+        size_2 = int(self.size[root_2])
+
+        # People on their own (size 1) were not in a group before this
+        self.num_groups += 1 - (size_1 > 1) - (size_2 > 1)
+        self.num_people_in_groups += (size_1 if size_1 == 1 else 0) + (size_2 if size_2 == 1 else 0)
+
+        # Attach the smaller group under the larger one
+        if size_1 < size_2:
+            root_1, root_2 = root_2, root_1
+        self.parent[root_2] = root_1
+        self.size[root_1] = size_1 + size_2
+
+        if size_1 + size_2 > self.largest_group_size:
+            self.largest_group_size = size_1 + size_2
+            self.__largest_group_member = root_1
+
+    # The average number of people in each friend group, 0 if there are none
+    @property
+    def avg_group_size(self):
+        if self.num_groups == 0:
+            return 0
+
+        return self.num_people_in_groups / self.num_groups
+
+    # Returns the group root of every person at once
+    def roots(self):
+        roots = self.parent.copy()
+
+        # Keep jumping to the parent's parent until everyone points at their root
+        while True:
+            grandparents = roots[roots]
+            if np.array_equal(grandparents, roots):
+                return roots
+            roots = grandparents
+
+    # Returns the sorted ids of everyone in the largest friend group (empty if there are no friendships)
+    def largest_group(self):
+        if self.__largest_group_member == -1:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.flatnonzero(self.roots() == self.find(self.__largest_group_member))
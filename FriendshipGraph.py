@@ -0,0 +1,92 @@
+import networkx as nx
+import numpy as np
+
+
+class FriendshipGraph:
+    """
+    Stores who is friends with who. Friendships are only ever added, never removed.
+
+    num_people - the number of people in the simulation
+    max_friends - the largest number of friends anyone can have, which is how much room each person's row gets
+
+    degree - degree[i] is the number of friends person i has
+    neighbors - a (num_people x max_friends) table where row i starts with person i's friends in the order they were
+                made, the rest of the row is unused (-1). This is a CSR adjacency where every row has the same room
+    edges - every friendship (person_1, person_2) as a row, in the order they were made
+
+    Checking whether two people are friends is O(1) through a hash set of the packed key
+    min(i, j) * num_people + max(i, j), so no lookup ever has to scan the friendships.
+    """
+
+    def __init__(self, num_people, max_friends):
+        self.num_people = num_people
+
+        self.degree = np.zeros(num_people, dtype=np.int32)
+        self.neighbors = np.full((num_people, max_friends), -1, dtype=np.int32)
+
+        # The edge list grows by doubling, num_edges of it is in use
+        self.__edges = np.empty((max(num_people, 16), 2), dtype=np.int32)
+        self.num_edges = 0
+
+        self.__edge_keys = set()
+
+    # Returns the packed key for the friendship between person_1 and person_2
+    def __edge_key(self, person_1, person_2):
+        if person_1 > person_2:
+            person_1, person_2 = person_2, person_1
+
+        return int(person_1) * self.num_people + int(person_2)
+
+    # Adds a friendship between person_1 and person_2, who must not already be friends
+    def add_friendship(self, person_1, person_2):
+        self.neighbors[person_1, self.degree[person_1]] = person_2
+        self.neighbors[person_2, self.degree[person_2]] = person_1
+        self.degree[person_1] += 1
+        self.degree[person_2] += 1
+
+        if self.num_edges == len(self.__edges):
+            self.__edges = np.concatenate((self.__edges, np.empty_like(self.__edges)))
+        self.__edges[self.num_edges] = (person_1, person_2)
+        self.num_edges += 1
+
+        self.__edge_keys.add(self.__edge_key(person_1, person_2))
+
+    # Returns whether person_1 and person_2 are friends
+    def are_friends(self, person_1, person_2):
+        return self.__edge_key(person_1, person_2) in self.__edge_keys
+
+    # Returns whether each pair (people_1[k], people_2[k]) are friends, as a boolean array
+    # Done by checking the pair against person_1's row, so it costs at most max_friends per pair
+    def are_friends_batch(self, people_1, people_2):
+        return np.any(self.neighbors[people_1] == np.asarray(people_2)[:, None], axis=1)
+
+    # Returns a view of person_idx's friends, in the order the friendships were made
+    def friends_of(self, person_idx):
+        return self.neighbors[person_idx, :self.degree[person_idx]]
+
+    # A (num_edges x 2) view of every friendship, in the order they were made
+    @property
+    def edges(self):
+        return self.__edges[:self.num_edges]
+
+    # Returns the compressed (indptr, indices) adjacency, where person i's friends are indices[indptr[i]:indptr[i + 1]]
+    #   This is the format scipy.sparse.csr_array((data, indices, indptr)) and the analytics use
+    def to_csr(self):
+        indptr = np.zeros(self.num_people + 1, dtype=np.int64)
+        np.cumsum(self.degree, out=indptr[1:])
+
+        in_use = np.arange(self.neighbors.shape[1]) < self.degree[:, None]
+        indices = self.neighbors[in_use]
+
+        return indptr, indices
+
+    # Returns a networkx Graph of the friendships
+    # include_loners - whether people without any friends are added as nodes
+    def to_networkx(self, include_loners=False):
+        friendship_graph = nx.Graph()
+
+        if include_loners:
+            friendship_graph.add_nodes_from(range(self.num_people))
+        friendship_graph.add_edges_from(self.edges.tolist())
+
+        return friendship_graph
@@ -0,0 +1,172 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from Population import count_bits
+
+# The constants of the splitmix64 hash, see ImplicitLikeScores
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_MULTIPLIER_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_MULTIPLIER_2 = np.uint64(0x94D049BB133111EB)
+
+
+# The same hash for a single counter, with Python integers, which is much faster than NumPy for one number
+def splitmix64_uniform_one(key, counter):
+    z = (key + (counter + 1) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    z ^= z >> 31
+
+    return (z >> 11) * 2.0 ** -53
+
+
+# Returns a uniform float in [0, 1) for each counter, the splitmix64 hash of key + (counter + 1) * GOLDEN_GAMMA
+# The same key and counter always give the same number, so any pair's random number can be worked out on its own
+def splitmix64_uniform(key, counters):
+    with np.errstate(over="ignore"):
+        z = np.uint64(key) + (np.asarray(counters, dtype=np.uint64) + np.uint64(1)) * GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * MIX_MULTIPLIER_1
+        z = (z ^ (z >> np.uint64(27))) * MIX_MULTIPLIER_2
+        z ^= z >> np.uint64(31)
+
+    # The top 53 bits fill a float64 exactly
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class ImplicitLikeScores:
+    """
+    Like scores that are never stored, but worked out from the population whenever they are read, so memory is O(N)
+    instead of O(N^2). Reads the same way as LikeScores (see LikeScores.py).
+
+    A like score is a fixed function of the two people's characteristics and preferences (see
+    Simulation.__calculate_like_score_rows) plus a random personality modifier. Instead of being drawn in order from a
+    random number generator, the modifier of pair (i, j) comes from a counter-based hash of (key, i, j), so it is the
+    same every time the pair is looked at.
+
+    population - the Population whose like scores these are
+    key - 64-bit key for the hash, different keys give different personality modifiers
+    initial_score_range - the range the personality modifier is drawn from
+    cache_size - how many single scores (see get) to keep, least recently used first out, so pairs that are looked up
+                 again and again (e.g. friends-of-friends meeting each day) aren't worked out every time. Only the score
+                 asked for is worked out on a miss. Default: 0, no cache
+    """
+
+    def __init__(self, population, key, initial_score_range=(0.3, 0.9), cache_size=0):
+        self.population = population
+        self.num_people = population.num_people
+        self.dtype = np.dtype(np.float64)
+        self.key = int(key)
+        self.initial_score_range = initial_score_range
+
+        self.cache_size = cache_size
+        self.__cache = OrderedDict()
+
+    @property
+    def shape(self):
+        return self.num_people, self.num_people
+
+    def __len__(self):
+        return self.num_people
+
+    # Returns how much each person in person_1 likes the person at the same position in person_2. The arrays can be of
+    #   any shapes that broadcast together, e.g. a column of people against a row of people gives a block of the matrix
+    def get_batch(self, person_1, person_2):
+        population = self.population
+        person_1, person_2 = np.broadcast_arrays(np.asarray(person_1, dtype=np.int64),
+                                                 np.asarray(person_2, dtype=np.int64))
+
+        # The personality modifier for every pair
+        low, high = self.initial_score_range
+        like_scores = low + (high - low) * splitmix64_uniform(self.key, person_1 * self.num_people + person_2)
+
+        # See how much person_1 prefers person_2's gender
+        like_scores += np.where(population.gender[person_1] == population.gender[person_2],
+                                population.same_gender_pref[person_1], population.opposite_gender_pref[person_1])
+
+        # The same-age bonus minus the penalty for each year of age difference
+        age_difference = np.abs(population.age[person_1].astype(np.int32) - population.age[person_2])
+        like_scores += population.same_age_pref[person_1]
+        like_scores -= age_difference * population.age_diff_pref[person_1]
+
+        # See how much person_1 prefers person_2's race
+        like_scores += np.where(population.race[person_1] == population.race[person_2],
+                                population.same_race_pref[person_1], population.other_race_pref[person_1])
+
+        # See how much person_1 likes person_2's hobbies
+        common_hobbies = count_bits(population.hobbies[person_1] & population.hobbies[person_2])
+        like_scores += common_hobbies * population.same_hobby_pref[person_1]
+
+        # A person will not become friends with themselves
+        return np.where(person_1 == person_2, 0.0, like_scores)
+
+    # Works out how much person_1 likes person_2 with Python numbers, in the same order as get_batch so the result is
+    #   exactly the same
+    def __calculate(self, person_1, person_2):
+        if person_1 == person_2:
+            return 0.0
+
+        population = self.population
+        low, high = self.initial_score_range
+        like_score = low + (high - low) * splitmix64_uniform_one(self.key, person_1 * self.num_people + person_2)
+
+        if population.gender.item(person_1) == population.gender.item(person_2):
+            like_score += population.same_gender_pref.item(person_1)
+        else:
+            like_score += population.opposite_gender_pref.item(person_1)
+
+        like_score += population.same_age_pref.item(person_1)
+        like_score -= abs(population.age.item(person_1) - population.age.item(person_2)) * \
+            population.age_diff_pref.item(person_1)
+
+        if population.race.item(person_1) == population.race.item(person_2):
+            like_score += population.same_race_pref.item(person_1)
+        else:
+            like_score += population.other_race_pref.item(person_1)
+
+        common_hobbies = bin(population.hobbies.item(person_1) & population.hobbies.item(person_2)).count("1")
+        like_score += common_hobbies * population.same_hobby_pref.item(person_1)
+
+        return like_score
+
+    # Returns how much person_1 likes person_2
+    def get(self, person_1, person_2):
+        if self.cache_size == 0:
+            return self.__calculate(person_1, person_2)
+
+        pair = person_1 * self.num_people + person_2
+        like_score = self.__cache.get(pair)
+
+        if like_score is None:
+            like_score = self.__calculate(person_1, person_2)
+            self.__cache[pair] = like_score
+            if len(self.__cache) > self.cache_size:
+                self.__cache.popitem(last=False)
+        else:
+            self.__cache.move_to_end(pair)
+
+        return like_score
+
+    # Returns rows start:stop, how much each of those people like everyone
+    def rows(self, start, stop):
+        return self.get_batch(np.arange(start, stop)[:, None], np.arange(self.num_people)[None, :])
+
+    # Returns columns start:stop, how much everyone likes each of those people
+    def columns(self, start, stop):
+        return self.get_batch(np.arange(self.num_people)[:, None], np.arange(start, stop)[None, :])
+
+    # like_scores[...] indexes the matrix like an array, working out only the scores asked for
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        index_1, index_2 = key + (slice(None),) * (2 - len(key))
+
+        people_1 = np.arange(self.num_people)[index_1] if isinstance(index_1, slice) else np.asarray(index_1)
+        people_2 = np.arange(self.num_people)[index_2] if isinstance(index_2, slice) else np.asarray(index_2)
+
+        # Like NumPy, a slice gives its own axis, after the axes of person_1 (or before those of person_2)
+        if isinstance(index_2, slice):
+            people_1 = people_1[..., None]
+        elif isinstance(index_1, slice):
+            people_1 = people_1.reshape((-1,) + (1,) * people_2.ndim)
+
+        return self.get_batch(people_1, people_2)
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+class InteractionWeights:
+    """
+    Keeps track of how likely everyone is to interact with everyone else. The weight person_1 has for person_2 is
+        1 (so people can meet strangers)
+        + direct_friend_weight if they are friends
+        + fof_weight for each friend they have in common
+    and nobody interacts with themselves. In matrix form: 1 + direct_friend_weight * A + fof_weight * A^2 with a zero
+    diagonal, where A is the friendship adjacency matrix.
+
+    Friendships are only ever added, so instead of rebuilding the matrix every day we update the few entries a new
+    friendship changes and only redo the running sums (used for sampling) of the rows that were touched.
+
+    num_people - the number of people in the simulation
+    direct_friend_weight - the bonus weight for interacting with a friend
+    fof_weight - the bonus weight for each common friend
+    """
+
+    def __init__(self, num_people, direct_friend_weight, fof_weight):
+        self.direct_friend_weight = direct_friend_weight
+        self.fof_weight = fof_weight
+
+        # Weights start at one so people can meet strangers, but nobody meets themselves
+        self.weights = np.ones((num_people, num_people))
+        np.fill_diagonal(self.weights, 0)
+        self.row_totals = self.weights.sum(axis=1)
+
+        # The running sum along each row of the weights, so a partner can be found with a binary search
+        self.cumulative_weights = np.cumsum(self.weights, axis=1)
+
+        # Rows whose weights changed since the running sums were last updated
+        self.__changed_rows = set()
+
+    # Updates the weights for a new friendship between person_1 and person_2
+    # person_1_friends, person_2_friends - arrays of their friends *before* this friendship is added
+    def add_friendship(self, person_1, person_2, person_1_friends, person_2_friends):
+
+        # They are now direct friends
+        self.weights[person_1, person_2] += self.direct_friend_weight
+        self.weights[person_2, person_1] += self.direct_friend_weight
+
+        # person_1's friends now have person_2 as a friend-of-friend (and the other way around)
+        self.weights[person_1_friends, person_2] += self.fof_weight
+        self.weights[person_2, person_1_friends] += self.fof_weight
+
+        # person_2's friends now have person_1 as a friend-of-friend (and the other way around)
+        self.weights[person_2_friends, person_1] += self.fof_weight
+        self.weights[person_1, person_2_friends] += self.fof_weight
+
+        # Keep the row totals up to date
+        self.row_totals[person_1] += self.direct_friend_weight + self.fof_weight * len(person_2_friends)
+        self.row_totals[person_2] += self.direct_friend_weight + self.fof_weight * len(person_1_friends)
+        self.row_totals[person_1_friends] += self.fof_weight
+        self.row_totals[person_2_friends] += self.fof_weight
+
+        self.__changed_rows.update((person_1, person_2))
+        self.__changed_rows.update(person_1_friends.tolist())
+        self.__changed_rows.update(person_2_friends.tolist())
+
+    # Brings the running sums up to date for the rows that changed since the last call
+    # Call this once at the start of each day, after which the running sums stay fixed until the next call
+    def update_cumulative_weights(self):
+        if self.__changed_rows:
+            changed_rows = np.fromiter(self.__changed_rows, dtype=np.int64)
+            self.cumulative_weights[changed_rows] = np.cumsum(self.weights[changed_rows], axis=1)
+            self.__changed_rows.clear()
+
+        return self.cumulative_weights
+
+    # Returns the (num_people x num_people) matrix where row i is the probability of person i interacting with everyone
+    def get_probabilities(self):
+        return self.weights / self.row_totals[:, None]
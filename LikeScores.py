@@ -0,0 +1,83 @@
+import numpy as np
+
+# The precisions the like scores can be stored in
+LIKE_SCORE_DTYPES = ("float64", "float32", "float16")
+
+
+class LikeScores:
+    """
+    The (num_people x num_people) matrix of how much everyone likes each other, where scores[person_1][person_2] is how
+    much person_1 likes person_2. Everything reads the like scores through this class, so the matrix can be stored in
+    less precise floats or in a file on disk instead of in memory.
+
+    num_people - the number of people in the simulation
+    dtype - the precision the scores are stored in, one of LIKE_SCORE_DTYPES. float32 halves the memory used and float16
+            quarters it, at the cost of rounding the scores (so a few pairs right at someone's friend threshold can end
+            up on the other side of it). Default: "float64"
+    path - a file to keep the matrix in as an np.memmap, so it doesn't have to fit in memory. Default: None, in memory
+
+    scores - the matrix itself
+
+    Values read out are always float64.
+    """
+
+    def __init__(self, num_people, dtype="float64", path=None):
+        if str(np.dtype(dtype)) not in LIKE_SCORE_DTYPES:
+            raise ValueError(f"Unknown like score dtype: {dtype}")
+
+        self.num_people = num_people
+        self.dtype = np.dtype(dtype)
+        self.path = path
+
+        if path is None:
+            self.scores = np.zeros((num_people, num_people), dtype=self.dtype)
+        else:
+            self.scores = np.memmap(path, dtype=self.dtype, mode="w+", shape=(num_people, num_people))
+
+    # Wraps an existing matrix (e.g. one memory-mapped from a checkpoint) without copying it
+    @classmethod
+    def from_array(cls, scores):
+        like_scores = cls.__new__(cls)
+        like_scores.num_people = len(scores)
+        like_scores.dtype = scores.dtype
+        like_scores.path = scores.filename if isinstance(scores, np.memmap) else None
+        like_scores.scores = scores
+
+        return like_scores
+
+    # Fills in the matrix block_size rows at a time, so only one block is ever held in float64
+    # calculate_rows(start, stop) - returns the float64 scores of rows start:stop
+    def fill(self, calculate_rows, block_size=1024):
+        for start in range(0, self.num_people, block_size):
+            stop = min(start + block_size, self.num_people)
+            self.scores[start:stop] = calculate_rows(start, stop)
+
+        if isinstance(self.scores, np.memmap):
+            self.scores.flush()
+
+    @property
+    def shape(self):
+        return self.scores.shape
+
+    def __len__(self):
+        return self.num_people
+
+    # like_scores[...] indexes the matrix like an array
+    def __getitem__(self, key):
+        return np.asarray(self.scores[key], dtype=np.float64)
+
+    # Returns how much person_1 likes person_2
+    def get(self, person_1, person_2):
+        return float(self.scores[person_1, person_2])
+
+    # Returns how much each person in the array person_1 likes the person at the same index of person_2
+    def get_batch(self, person_1, person_2):
+        return self.scores[person_1, person_2].astype(np.float64)
+
+    # Returns rows start:stop, how much each of those people like everyone
+    def rows(self, start, stop):
+        return self[start:stop]
+
+    # Returns columns start:stop, how much everyone likes each of those people
+    def columns(self, start, stop):
+        return self[:, start:stop]
@@ -1,12 +1,18 @@
 # Ben Williams '25, Sam Starrs '26
 # April 2024
-import random
+from Population import MIN_AGE, MAX_AGE, NUM_RACES, NUM_HOBBIES, bitmask_to_hobbies
 
 
 class Person:
     """
+    A lightweight view onto one person (row) of a Population. All of the data lives in the Population's arrays and
+    the simulation's FriendshipGraph, see Population.py and FriendshipGraph.py for how it is stored.
+
+    population - the Population this person belongs to
+    person_id - the id (integer) of the person, which is also their index into the population arrays
+    friendship_graph - the FriendshipGraph with this person's friends
+
     max_friends - the maximum number of friends this person can have
-    person_id - the id (integer) of the person
     characteristics - the age, gender, race, and hobbies of the person:
         age is in [18, 50] inclusive
         gender is in {0, 1}
@@ -14,89 +20,78 @@ class Person:
         hobbies is four numbers in {0, 1, ... , 18, 19}
     preferences - how much of a bonus or penalty does a person have for ages/genders/races/hobbies. Format below:
         preferences["age"] is a list of the bonus / penalty for a given age in [18, 50]
-            so preferences["age"][30] would be the modifier for how much this person likes a 30-year-old
+            so preferences["age"][30 - 18] would be the modifier for how much this person likes a 30-year-old
         all keys: "age", "gender", "race", "hobbies"
 
-    Characteristics and preferences are randomly generated if none are given
+    characteristics and preferences are built from the population arrays each time they are accessed
     """
+    __slots__ = ("population", "id", "friendship_graph")
 
-    def __init__(self, max_friends, person_id, characteristics=None, preferences=None):
-        # May modify this later
-        self.friend_threshold = random.uniform(0.5, 0.9)
-
-        self.max_friends = max_friends
+    def __init__(self, population, person_id, friendship_graph):
+        self.population = population
         self.id = person_id
-
-        # Check if we are given pre-defined characteristics
-        if not characteristics:
-            self.characteristics = dict()
-            self.__create_random_characteristics()
-        else:
-            self.characteristics = characteristics
-
-        # Check if we are given pre-defined preferences
-        if not preferences:
-            self.preferences = self.__generate_random_preferences()
-        else:
-            self.preferences = preferences
-
-        self.friends = []
-
-    # Creates random characteristics for this person
-    def __create_random_characteristics(self):
-        self.characteristics = {
-            "age":  random.randint(18, 50),  # Select a random age in {18, 50}
-            "gender": random.randint(0, 1),  # Select a random gender in {0, 1}
-            "race": random.randint(0, 5),  # Select a random race out of 6 options {0, 1, 2, 3, 4, 5}
-            "hobbies": set(random.sample(range(20), 4)),  # Pick four hobbies out of twenty
+        self.friendship_graph = friendship_graph
+
+    @property
+    def friend_threshold(self):
+        return float(self.population.friend_threshold[self.id])
+
+    @property
+    def max_friends(self):
+        return int(self.population.max_friends[self.id])
+
+    @property
+    def friends(self):
+        return self.friendship_graph.friends_of(self.id).tolist()
+
+    @property
+    def characteristics(self):
+        population = self.population
+        return {
+            "age": int(population.age[self.id]),
+            "gender": int(population.gender[self.id]),
+            "race": int(population.race[self.id]),
+            "hobbies": bitmask_to_hobbies(population.hobbies[self.id]),
         }
 
-    # Creates random preferences for this person based on their characteristics
-    def __generate_random_preferences(self):
+    @property
+    def preferences(self):
+        population = self.population
+        person_id = self.id
         preferences = dict()
 
         # Age preferences
-        same_age_pref = random.random() / 20  # bonus between 0 and 0.05 for same age
-        age_diff_penalty = random.random() / 50  # penalty between 0 and 0.01 for each year of age difference
-        preferences["age"] = [same_age_pref - abs(self.characteristics["age"] - age) * age_diff_penalty
-                                   for age in range(18, 51)]
-
-        # For printing out the person's preferences
-        preferences["same_age"] = float("{:.3f}".format(same_age_pref))
-        preferences["age_year_diff"] = float("{:.3f}".format(age_diff_penalty))
+        same_age_pref = float(population.same_age_pref[person_id])
+        age_diff_penalty = float(population.age_diff_pref[person_id])
+        own_age = int(population.age[person_id])
+        preferences["age"] = [same_age_pref - abs(own_age - age) * age_diff_penalty
+                              for age in range(MIN_AGE, MAX_AGE + 1)]
 
         # Gender preferences
-        same_gender_pref = random.random() / 20  # bonus between 0 and 0.05 for same gender
-        opposite_gender_pref = -random.random() / 10  # penalty between 0 and 0.1 for opposite gender
+        same_gender_pref = float(population.same_gender_pref[person_id])
+        opposite_gender_pref = float(population.opposite_gender_pref[person_id])
         preferences["gender"] = [same_gender_pref, opposite_gender_pref] \
-            if self.characteristics["gender"] == 0 \
+            if population.gender[person_id] == 0 \
             else [opposite_gender_pref, same_gender_pref]
 
-        # For printing out the person's preferences
-        preferences["same_gender"] = float("{:.3f}".format(same_gender_pref))
-        preferences["opposite_gender"] = float("{:.3f}".format(opposite_gender_pref))
-
         # Race preferences
-        same_race_pref = random.random() / 3  # bonus between 0 and 0.33 for same race
-        other_race_pref = -random.random() / 5  # penalty between 0 and 0.20 for other race
-        race_preferences = []
-        for race in range(6):
-            race_preferences.append(same_race_pref if self.characteristics["race"] == race else other_race_pref)
+        same_race_pref = float(population.same_race_pref[person_id])
+        other_race_pref = float(population.other_race_pref[person_id])
+        preferences["race"] = [same_race_pref if population.race[person_id] == race else other_race_pref
+                               for race in range(NUM_RACES)]
 
-        preferences["race"] = race_preferences
+        # Hobby preferences
+        similar_hobby_pref = float(population.same_hobby_pref[person_id])
+        hobbies = bitmask_to_hobbies(population.hobbies[person_id])
+        preferences["hobbies"] = [similar_hobby_pref if hobby in hobbies else 0 for hobby in range(NUM_HOBBIES)]
 
-        # For printing out info
+        # For printing out the person's preferences
+        preferences["same_age"] = float("{:.3f}".format(same_age_pref))
+        preferences["age_year_diff"] = float("{:.3f}".format(age_diff_penalty))
+        preferences["same_gender"] = float("{:.3f}".format(same_gender_pref))
+        preferences["opposite_gender"] = float("{:.3f}".format(opposite_gender_pref))
         preferences["same_race"] = float("{:.3f}".format(same_race_pref))
         preferences["other_race"] = float("{:.3f}".format(other_race_pref))
-
-        # Hobby Preferences
-        similar_hobby_pref = random.random() / 20  # bonus between 0 and 0.05 for each common hobby
-        hobby_preferences = []
-        for hobby in range(20):
-            hobby_preferences.append(similar_hobby_pref if hobby in self.characteristics["hobbies"] else 0)
-        preferences["hobbies"] = hobby_preferences
-
-        # For printing the preferences
         preferences["same_hobby"] = float("{:.3f}".format(similar_hobby_pref))
 
         return preferences
@@ -105,10 +100,11 @@ class Person:
     #   then we could maybe adjust this to have newlines or whatever formatting is necessary. Alternatively,
     #   we can keep this and have a get_label() method.
     def __str__(self):
-        return f"ID: {self.id}\n\tNumber of Friends: {len(self.friends)}\n\tFriend Threshold:{'{:.3f}'.format(self.friend_threshold)}\n\tGender: {self.characteristics['gender']}\n\t" + \
-               f"Age: {self.characteristics['age']}\n\tRace: {self.characteristics['race']}\n\tHobbies: {self.characteristics['hobbies']}\n\tPreferences:\n\t\t" + \
-               f"Same Gender: {self.preferences['same_gender']}\n\t\tOpposite Gender: {self.preferences['opposite_gender']}\n\t\t" + \
-               f"Same Race: {self.preferences['same_race']}\n\t\tOther Race: {self.preferences['other_race']}\n\t\t" + \
-               f"Same age bonus: {self.preferences['same_age']}\n\t\tAge penalty per year difference: {self.preferences['age_year_diff']}" + \
-               f"\n\t\tBonus per common hobby: {self.preferences['same_hobby']}"
-
+        characteristics = self.characteristics
+        preferences = self.preferences
+        return f"ID: {self.id}\n\tNumber of Friends: {len(self.friends)}\n\tFriend Threshold:{'{:.3f}'.format(self.friend_threshold)}\n\tGender: {characteristics['gender']}\n\t" + \
+               f"Age: {characteristics['age']}\n\tRace: {characteristics['race']}\n\tHobbies: {characteristics['hobbies']}\n\tPreferences:\n\t\t" + \
+               f"Same Gender: {preferences['same_gender']}\n\t\tOpposite Gender: {preferences['opposite_gender']}\n\t\t" + \
+               f"Same Race: {preferences['same_race']}\n\t\tOther Race: {preferences['other_race']}\n\t\t" + \
+               f"Same age bonus: {preferences['same_age']}\n\t\tAge penalty per year difference: {preferences['age_year_diff']}" + \
+               f"\n\t\tBonus per common hobby: {preferences['same_hobby']}"
@@ -0,0 +1,154 @@
+import numpy as np
+
+# The ranges of each characteristic, see Person.py for what they mean
+MIN_AGE = 18
+MAX_AGE = 50
+NUM_GENDERS = 2
+NUM_RACES = 6
+NUM_HOBBIES = 20
+HOBBIES_PER_PERSON = 4
+
+
+class Population:
+    """
+    Stores everyone in the simulation as contiguous arrays, where index i of every array belongs to person i.
+    A Person object is just a view onto one index of these arrays.
+
+    num_people - the number of people in the population
+
+    Characteristics:
+        age - in [18, 50] inclusive
+        gender - in {0, 1}
+        race - in {0, 1, 2, 3, 4, 5}
+        hobbies - a bitmask of the person's four hobbies out of twenty, bit h is set if they have hobby h
+
+    Friendship parameters:
+        friend_threshold - how much a person has to like someone to become their friend
+        max_friends - the maximum number of friends each person can have
+    (who is friends with who is kept in the simulation's FriendshipGraph)
+
+    Preference parameters (the full preference lists are derived from these, see Person.preferences):
+        same_age_pref - bonus for someone of the same age
+        age_diff_pref - penalty for each year of age difference
+        same_gender_pref - bonus for someone of the same gender
+        opposite_gender_pref - bonus/penalty for someone of the opposite gender
+        same_race_pref - bonus for someone of the same race
+        other_race_pref - bonus/penalty for someone of another race
+        same_hobby_pref - bonus for each common hobby
+    """
+
+    def __init__(self, num_people):
+        self.num_people = num_people
+
+        # Characteristics
+        self.age = np.zeros(num_people, dtype=np.int8)
+        self.gender = np.zeros(num_people, dtype=np.int8)
+        self.race = np.zeros(num_people, dtype=np.int8)
+        self.hobbies = np.zeros(num_people, dtype=np.uint32)
+
+        # Friendship parameters
+        self.friend_threshold = np.zeros(num_people)
+        self.max_friends = np.zeros(num_people, dtype=np.int32)
+
+        # Preference parameters
+        self.same_age_pref = np.zeros(num_people)
+        self.age_diff_pref = np.zeros(num_people)
+        self.same_gender_pref = np.zeros(num_people)
+        self.opposite_gender_pref = np.zeros(num_people)
+        self.same_race_pref = np.zeros(num_people)
+        self.other_race_pref = np.zeros(num_people)
+        self.same_hobby_pref = np.zeros(num_people)
+
+    # Creates a population where everyone's max friends are in [min_friends, max_friends] and their characteristics
+    #   and preferences are randomly generated. Every attribute is drawn for the whole population at once
+    # seed - seed for the random number generator, so the same seed always creates the same population
+    @classmethod
+    def random(cls, num_people, min_friends, max_friends, seed=None):
+        rng = np.random.default_rng(seed)
+        population = cls(num_people)
+
+        population.max_friends[:] = rng.integers(min_friends, max_friends, endpoint=True, size=num_people)
+
+        # May modify this later
+        population.friend_threshold[:] = rng.uniform(0.5, 0.9, size=num_people)
+
+        # Characteristics
+        population.age[:] = rng.integers(MIN_AGE, MAX_AGE, endpoint=True, size=num_people)  # A random age in {18, 50}
+        population.gender[:] = rng.integers(0, NUM_GENDERS, size=num_people)  # A random gender in {0, 1}
+        population.race[:] = rng.integers(0, NUM_RACES, size=num_people)  # A random race out of 6 options
+        population.hobbies[:] = random_hobby_bitmasks(rng, num_people)  # Pick four hobbies out of twenty
+
+        # Preferences
+        population.same_age_pref[:] = rng.random(num_people) / 20  # bonus between 0 and 0.05 for same age
+        population.age_diff_pref[:] = rng.random(num_people) / 50  # penalty between 0 and 0.02 per year of difference
+        population.same_gender_pref[:] = rng.random(num_people) / 20  # bonus between 0 and 0.05 for same gender
+        population.opposite_gender_pref[:] = -rng.random(num_people) / 10  # penalty between 0 and 0.1 for opposite
+        population.same_race_pref[:] = rng.random(num_people) / 3  # bonus between 0 and 0.33 for same race
+        population.other_race_pref[:] = -rng.random(num_people) / 5  # penalty between 0 and 0.20 for other race
+        population.same_hobby_pref[:] = rng.random(num_people) / 20  # bonus between 0 and 0.05 per common hobby
+
+        return population
+
+    # Returns a dictionary of every array, by attribute name
+    def arrays(self):
+        return {name: array for name, array in vars(self).items() if isinstance(array, np.ndarray)}
+
+    # Creates a population from the arrays of another one (see arrays())
+    @classmethod
+    def from_arrays(cls, arrays):
+        population = cls(len(arrays["age"]))
+        for name, array in arrays.items():
+            setattr(population, name, array)
+
+        return population
+
+    # Returns a (num_people x 20) matrix where entry [person][hobby] is 1 if the person has that hobby
+    def hobby_matrix(self):
+        return ((self.hobbies[:, None] >> np.arange(NUM_HOBBIES, dtype=np.uint32)) & 1).astype(np.float64)
+
+
+# Packs a collection of hobbies in {0, 1, ... , 19} into a bitmask
+def hobbies_to_bitmask(hobbies):
+    bitmask = 0
+    for hobby in hobbies:
+        bitmask |= 1 << hobby
+
+    return bitmask
+
+
+# Picks four distinct hobbies out of twenty for each of num_people people, returned as bitmasks
+# Ranking a row of random keys and keeping the four smallest is a uniformly random 4-subset, the same
+#   distribution as random.sample(range(20), 4). We work in chunks so the keys never take much memory
+def random_hobby_bitmasks(rng, num_people, chunk_size=1 << 18):
+    bitmasks = np.zeros(num_people, dtype=np.uint32)
+    hobby_bits = np.uint32(1) << np.arange(NUM_HOBBIES, dtype=np.uint32)
+
+    for start in range(0, num_people, chunk_size):
+        stop = min(start + chunk_size, num_people)
+        keys = rng.random((stop - start, NUM_HOBBIES), dtype=np.float32)
+        hobbies = np.argpartition(keys, HOBBIES_PER_PERSON, axis=1)[:, :HOBBIES_PER_PERSON]
+        bitmasks[start:stop] = hobby_bits[hobbies].sum(axis=1, dtype=np.uint32)
+
+    return bitmasks
+
+
+# Unpacks a hobby bitmask into the set of hobbies
+def bitmask_to_hobbies(bitmask):
+    return {hobby for hobby in range(NUM_HOBBIES) if (int(bitmask) >> hobby) & 1}
+
+
+# BIT_COUNTS[x] is the number of bits set in the 16-bit number x
+BIT_COUNTS = np.unpackbits(np.arange(1 << 16, dtype=np.uint16).view(np.uint8).reshape(-1, 2), axis=1)
+BIT_COUNTS = BIT_COUNTS.sum(axis=1, dtype=np.uint8)
+
+
+# Returns how many bits are set in each number of an array of unsigned integers of up to 32 bits, e.g. how many hobbies
+#   two bitmasks have in common (np.bitwise_count does the same, but needs NumPy 2)
+def count_bits(x):
+    x = np.asarray(x)
+    if x.dtype.itemsize > 4:
+        raise ValueError(f"Can only count the bits of integers of up to 32 bits, not {x.dtype}")
+
+    if x.dtype.itemsize <= 2:
+        return BIT_COUNTS[x]
+    return BIT_COUNTS[x & 0xFFFF] + BIT_COUNTS[x >> 16]
@@ -0,0 +1,187 @@
+import json
+import numpy as np
+
+import simulation_analysis_funcs
+
+
+class ResultsStore:
+    """
+    Every statistic of one or more simulations, stored as NumPy columns indexed by run and day, that can be saved to
+    and loaded from a single .npz file in one call.
+
+    num_runs - the number of simulations stored. Default: 1
+    day_capacity - how many days of room the columns start with, they double in size whenever they run out. Default: 64
+
+    num_days - the number of days stored
+    columns - columns[(dict_name, key)] is an array of shape (num_runs, num_days) (or (num_runs, num_days, ...) for
+              the distributions) with the statistic for each run and day, nan on days it wasn't computed. dict_name and
+              key are the same as in simulation_analysis_funcs.get_empty_analysis_dicts
+    titles - titles[(dict_name, key)] is the (title, label) of the statistic
+
+    Which mode produced the connectedness numbers is stored in the "connectedness_modes" columns, 1 for approximate.
+    """
+
+    def __init__(self, num_runs=1, day_capacity=64):
+        self.num_runs = num_runs
+        self.num_days = 0
+        self.titles = dict()
+
+        # The full columns, with room for more days than are stored
+        self.__columns = dict()
+        self.__day_capacity = day_capacity
+
+        # Whether each value was recorded as a whole number, in the same layout as the columns (without the
+        #   distributions' extra axes), so the reports can print it the way it was recorded
+        self.__is_integer = dict()
+
+    @property
+    def columns(self):
+        return {name: column[:, :self.num_days] for name, column in self.__columns.items()}
+
+    # Returns the column of a statistic, see columns
+    def column(self, dict_name, key):
+        return self.__columns[(dict_name, key)][:, :self.num_days]
+
+    # Returns the days (starting at 1) the statistic has a value on, for one run
+    def days(self, dict_name, key, run=0):
+        column = self.column(dict_name, key)[run]
+        has_value = ~np.isnan(column).reshape(len(column), -1).all(axis=1)
+
+        return np.flatnonzero(has_value) + 1
+
+    # Makes room for at least num_days days in every column
+    def __reserve_days(self, num_days):
+        if num_days > self.__day_capacity:
+            while num_days > self.__day_capacity:
+                self.__day_capacity *= 2
+
+            for name, column in self.__columns.items():
+                grown = np.full((self.num_runs, self.__day_capacity) + column.shape[2:], np.nan)
+                grown[:, :column.shape[1]] = column
+                self.__columns[name] = grown
+
+                is_integer = np.zeros((self.num_runs, self.__day_capacity), dtype=bool)
+                is_integer[:, :column.shape[1]] = self.__is_integer[name]
+                self.__is_integer[name] = is_integer
+
+        self.num_days = max(self.num_days, num_days)
+
+    # Returns the full column for a statistic, making it the first time with room for values of the given shape
+    def __get_column(self, dict_name, key, value_shape, title, label):
+        name = (dict_name, key)
+
+        if name not in self.__columns:
+            self.__columns[name] = np.full((self.num_runs, self.__day_capacity) + value_shape, np.nan)
+            self.__is_integer[name] = np.zeros((self.num_runs, self.__day_capacity), dtype=bool)
+            self.titles[name] = (title, label)
+
+        return self.__columns[name]
+
+    # Stores the value of a statistic on a day (starting at 1). None is stored as nan
+    def record(self, dict_name, key, day, value, run=0, title="", label=""):
+        is_integer = value is None or isinstance(value, (int, np.integer))
+        value = np.asarray(value, dtype=np.float64)
+
+        self.__reserve_days(day)
+        self.__get_column(dict_name, key, value.shape, title, label)[run, day - 1] = value
+        self.__is_integer[(dict_name, key)][run, day - 1] = is_integer
+
+    # Stores a statistic for every day at once, curve[day - 1] being its value on that day (nan if not computed)
+    def record_curve(self, dict_name, key, curve, run=0, title="", label=""):
+        is_integer = np.issubdtype(np.asarray(curve).dtype, np.integer)
+        curve = np.asarray(curve, dtype=np.float64)
+
+        self.__reserve_days(len(curve))
+        self.__get_column(dict_name, key, curve.shape[1:], title, label)[run, :len(curve)] = curve
+        self.__is_integer[(dict_name, key)][run, :len(curve)] = is_integer
+
+    # Makes a ResultsStore of every statistic a simulation has computed
+    @classmethod
+    def from_simulation(cls, simulation):
+        store = cls(day_capacity=max(len(simulation.day_num_edges), 1))
+
+        for dict_name in simulation_analysis_funcs.ANALYSIS_DICT_NAMES:
+            for key, (values, title, label, days) in getattr(simulation, dict_name).items():
+                for value, day in zip(values, days):
+                    store.record(dict_name, key, day, value, title=title, label=label)
+
+        connectedness_days = simulation.connectedness_dict["avg_avg_deg_sep"][3]
+        for modes, day in zip(simulation.connectedness_modes, connectedness_days):
+            for key, mode in modes.items():
+                store.record("connectedness_modes", key, day, mode == "approximate",
+                             title=f"Approximate {key}", label="Approximate")
+
+        return store
+
+    # Saves every column to a .npz file. Columns are saved uncompressed, so loading them is fast
+    def save(self, path):
+        names = list(self.__columns)
+        metadata = {
+            "num_runs": self.num_runs,
+            "num_days": self.num_days,
+            "columns": [{"dict_name": dict_name, "key": key, "title": self.titles[(dict_name, key)][0],
+                         "label": self.titles[(dict_name, key)][1]}
+                        for dict_name, key in names],
+        }
+
+        arrays = {f"column_{i}": self.column(*name) for i, name in enumerate(names)}
+        arrays.update({f"is_integer_{i}": self.__is_integer[name][:, :self.num_days] for i, name in enumerate(names)})
+        np.savez(path, metadata=np.array(json.dumps(metadata)), **arrays)
+
+    # Loads a ResultsStore saved with save()
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            metadata = json.loads(str(saved["metadata"]))
+            store = cls(num_runs=metadata["num_runs"], day_capacity=max(metadata["num_days"], 1))
+            store.num_days = metadata["num_days"]
+
+            for i, column_info in enumerate(metadata["columns"]):
+                name = (column_info["dict_name"], column_info["key"])
+                store.__columns[name] = saved[f"column_{i}"]
+                store.__is_integer[name] = saved[f"is_integer_{i}"]
+                store.titles[name] = (column_info["title"], column_info["label"])
+
+        return store
+
+    # Returns how the value of a statistic on a day (starting at 1) is written in the reports, the same as the value
+    #   that was recorded would be
+    def __format_value(self, name, run, day):
+        value = self.__columns[name][run, day - 1]
+
+        if value.ndim > 0:
+            return str(value)
+        if np.isnan(value):
+            return "None"
+        if self.__is_integer[name][run, day - 1]:
+            return str(int(value))
+
+        return str(float(value))
+
+    # Writes the statistics of one run, day by day, to an open text file (see Simulation.print_analysis)
+    # dict_names - which analysis dictionaries to write, in order
+    def write_report(self, file, run=0, dict_names=("connectedness_dict", "friend_group_dict", "loner_dict",
+                                                     "plugin_dict")):
+        print("Simulation Analysis:", file=file)
+
+        for dict_name in dict_names:
+            for name, (title, label) in self.titles.items():
+                if name[0] != dict_name:
+                    continue
+
+                is_approximate = self.__columns.get(("connectedness_modes", name[1])) \
+                    if dict_name == "connectedness_dict" else None
+
+                print(title + " Over Time", file=file)
+                for day in self.days(*name, run=run):
+                    text = self.__format_value(name, run, day)
+
+                    # Say which numbers were estimated rather than computed exactly
+                    if is_approximate is not None and is_approximate[run, day - 1] == 1:
+                        if name[1] == "avg_avg_deg_sep":
+                            ci = self.__format_value(("connectedness_dict", "avg_avg_deg_sep_ci"), run, day)
+                            text += f" +/- {ci} (approximate)"
+                        else:
+                            text += " (approximate, lower bound)"
+
+                    print(f"\t\tDay {day}: {text}", file=file)
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class SeparationTracker:
+    """
+    Keeps the degree of separation between every pair of people up to date as friendships are made, so the
+    connectedness analytics don't have to search the whole graph again every day.
+
+    Adding the friendship (u, v) can only shorten paths that now go through it. A pair (x, y) gets closer only if x is
+    closer to u than to v and y is closer to v than to u, so only that block of the matrix is relaxed, and the work
+    each day scales with how much the separations actually changed. Joining two friend groups is the same update:
+    everyone in u's group is "closer to u" and everyone in v's group is "closer to v", so the whole cross block goes
+    from unreachable to finite.
+
+    num_people - the number of people in the simulation
+
+    distances - (num_people x num_people) matrix of degrees of separation, stored as uint8 if everyone fits (fewer
+                than 255 people) and uint16 otherwise. People who can't reach each other are set to unreachable
+    total_separation - total_separation[i] is the sum of person i's separation from everyone they can reach
+
+    Each person's eccentricity (separation from the farthest person they can reach) is only worked out again when
+    asked for with get_eccentricity, and only for people whose separations changed since the last time.
+    """
+
+    def __init__(self, num_people, block_size=1024):
+        if num_people < np.iinfo(np.uint8).max:
+            dtype = np.uint8
+        elif num_people < np.iinfo(np.uint16).max:
+            dtype = np.uint16
+        else:
+            raise ValueError(f"Can't track the separation of {num_people} people, at most 65534 are supported")
+
+        self.unreachable = np.iinfo(dtype).max
+        self.block_size = block_size
+
+        self.distances = np.full((num_people, num_people), self.unreachable, dtype=dtype)
+        np.fill_diagonal(self.distances, 0)
+
+        self.total_separation = np.zeros(num_people, dtype=np.int64)
+        self.__eccentricity = np.zeros(num_people, dtype=np.int64)
+        self.__eccentricity_changed = np.zeros(num_people, dtype=bool)
+
+    # Updates the separations for a new friendship between person_1 and person_2
+    def add_friendship(self, person_1, person_2):
+        distances = self.distances
+
+        # The matrix is symmetric, so rows are used instead of columns since they are contiguous
+        to_person_1 = distances[person_1].astype(np.int64)
+        to_person_2 = distances[person_2].astype(np.int64)
+
+        near_person_1 = np.flatnonzero(to_person_1 + 1 < to_person_2)
+        near_person_2 = np.flatnonzero(to_person_2 + 1 < to_person_1)
+
+        # Relax the block in chunks of rows so the temporary arrays stay small
+        for start in range(0, len(near_person_1), self.block_size):
+            rows = near_person_1[start:start + self.block_size]
+
+            old_block = distances[np.ix_(rows, near_person_2)].astype(np.int64)
+            through_friendship = to_person_1[rows, None] + 1 + to_person_2[None, near_person_2]
+            new_block = np.minimum(old_block, through_friendship)
+
+            # Only reachable pairs count towards the totals
+            change = new_block - np.where(old_block == self.unreachable, 0, old_block)
+            self.total_separation[rows] += change.sum(axis=1)
+            self.total_separation[near_person_2] += change.sum(axis=0)
+
+            distances[np.ix_(rows, near_person_2)] = new_block
+            distances[np.ix_(near_person_2, rows)] = new_block.T
+
+        # Everyone whose separations changed needs their farthest person found again
+        self.__eccentricity_changed[near_person_1] = True
+        self.__eccentricity_changed[near_person_2] = True
+
+    # Returns the eccentricity of each of the given people
+    def get_eccentricity(self, people):
+        changed = people[self.__eccentricity_changed[people]]
+
+        for start in range(0, len(changed), self.block_size):
+            rows = changed[start:start + self.block_size]
+            row_distances = self.distances[rows]
+            self.__eccentricity[rows] = np.where(row_distances == self.unreachable, 0, row_distances).max(axis=1)
+        self.__eccentricity_changed[changed] = False
+
+        return self.__eccentricity[people]
+
+    # Checks the tracked separations against a full breadth-first search from each of the given people
+    #   Raises a RuntimeError if anything doesn't match
+    def verify(self, people, total_separation, eccentricity):
+        if not np.array_equal(self.total_separation[people], total_separation):
+            raise RuntimeError("Tracked total separations don't match a full recompute")
+
+        if not np.array_equal(self.get_eccentricity(people), eccentricity):
+            raise RuntimeError("Tracked eccentricities don't match a full recompute")
@@ -4,6 +4,16 @@ from matplotlib import animation
 
 # For the logic of characteristics and preferences
 from Person import Person
+from Population import Population
+from FriendshipGraph import FriendshipGraph
+from LikeScores import LikeScores
+from ImplicitLikeScores import ImplicitLikeScores
+from CompatibilityIndex import CompatibilityIndex, ImplicitCompatibility
+from FriendGroups import FriendGroups
+from SeparationTracker import SeparationTracker
+from InteractionWeights import InteractionWeights
+from interaction_samplers import CumulativeSampler, MixtureSampler
+from ActiveSet import ActiveSet
 
 # For all plotting and graph making
 import matplotlib.pyplot as plt
@@ -12,19 +22,25 @@ import networkx as nx
 # To help with sorting the nodes
 from operator import itemgetter
 
-# For all randomization of interactions and people generation
-import random
-
 # For more efficient matrix and random operations
 import numpy as np
 
 # For analysis functions
 import simulation_analysis_funcs
+from AnalyticsSnapshot import AnalyticsSnapshot, replay_snapshots
+from ResultsStore import ResultsStore
 
 # To create directories and delete unwanted files
 import os
 import subprocess
 
+# For saving checkpoints
+import json
+
+
+# The groups of metrics that can be scheduled separately, see Simulation.run_simulation
+ANALYTICS_METRICS = ("friend_group", "connectedness", "loners", "plugins")
+
 
 # Allows us to close the plot on a timer - making it so you don't have to click to close plots
 # This is a workaround to a networkx limitation
@@ -32,6 +48,59 @@ def close_plot_event():
     plt.close()
 
 
+# For each element, returns how many elements of the same group come before it when ordered by priority
+#   e.g. groups [4, 7, 4, 4] with priorities [2, 0, 0, 1] gives ranks [2, 0, 0, 1]
+# other_groups - optional second group array, for ranking each person across both ends of a list of pairs
+def rank_within_groups(groups, priority, other_groups=None):
+    if other_groups is not None:
+        # Rank the pairs in the combined list of both ends, then keep the ranks for the groups end
+        both_groups = np.concatenate((groups, other_groups))
+        return rank_within_groups(both_groups, np.concatenate((priority, priority)))[:len(groups)]
+
+    order = np.lexsort((priority, groups))
+    sorted_groups = groups[order]
+
+    # The position in sorted order of the first element of each element's group
+    group_starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    group_start_of_element = group_starts[np.searchsorted(group_starts, np.arange(len(groups)), side="right") - 1]
+
+    ranks = np.empty(len(groups), dtype=np.int64)
+    ranks[order] = np.arange(len(groups)) - group_start_of_element
+
+    return ranks
+
+
+# Converts analytics results to something json can save. Person objects are saved as their id, arrays and NumPy
+#   numbers as lists and Python numbers
+def _results_to_json(results):
+    if isinstance(results, dict):
+        return {"dict": [[_results_to_json(key), _results_to_json(value)] for key, value in results.items()]}
+    if isinstance(results, (list, tuple)):
+        return [_results_to_json(value) for value in results]
+    if isinstance(results, Person):
+        return {"person": results.id}
+    if isinstance(results, np.ndarray):
+        return {"array": results.tolist(), "dtype": str(results.dtype)}
+    if isinstance(results, np.generic):
+        return results.item()
+
+    return results
+
+
+# Reverses _results_to_json, with Person objects being the simulation's people
+def _results_from_json(results, people):
+    if isinstance(results, list):
+        return [_results_from_json(value, people) for value in results]
+    if not isinstance(results, dict):
+        return results
+    if "dict" in results:
+        return {_results_from_json(key, people): _results_from_json(value, people) for key, value in results["dict"]}
+    if "person" in results:
+        return people[results["person"]]
+
+    return np.array(results["array"], dtype=results["dtype"])
+
+
 class Simulation:
     """
     min_friends - the minimum number of **max friends** an individual person might have. Default: 3
@@ -39,8 +108,36 @@ class Simulation:
     num_people - the number of people who will be in the simulation. Default: 100
     min_interactions - The minimum number of interactions someone could have in a day. Default: 5
     max_interactions - The maximum number of interactions someone could have in a day. Default: 30
+    sampler - How interaction partners are picked, both give the same probabilities. Default: "cumulative"
+        "cumulative" - keeps the (num_people x num_people) interaction weight matrix and samples from its rows
+        "mixture" - never builds the matrix, samples from each person's friends and friends-of-friends directly.
+                    Uses far less memory for large populations
+    track_separation - Whether to keep everyone's degrees of separation up to date as friendships are made, so the
+                       connectedness analytics don't search the whole graph each day. Uses a (num_people x num_people)
+                       matrix of small integers. Default: False
+    seed - where all of the simulation's randomness comes from, anything np.random.SeedSequence accepts or a
+           SeedSequence (e.g. one spawned for an ensemble). The same seed always gives the same simulation.
+           Default: None, a fresh random seed
+    like_score_dtype - the precision the like scores are stored in, "float64", "float32" or "float16", see
+                       LikeScores.py. Default: "float64"
+    like_score_path - a file to keep the like scores in (memory-mapped) instead of in memory. Together with a smaller
+                      like_score_dtype and the "mixture" sampler, this is what makes very large populations fit.
+                      Default: None
+    implicit_like_scores - Whether to work out like scores whenever they are needed instead of storing them, from a
+                           hash of the seed and the pair of people, so memory is O(N) instead of O(N^2). Gives different
+                           like scores than storing them. See ImplicitLikeScores.py. Default: False
+    like_score_cache_size - how many implicit like scores to keep for single lookups, see ImplicitLikeScores.py.
+                            Default: 0
+    compatibility_index - Whether to precompute who is compatible with who (one bit per pair, see CompatibilityIndex.py)
+                          rather than comparing like scores each time. Default: True, or False with implicit_like_scores
+    skip_inactive - Whether people only interact with people who can still make friends that day (who have interactions
+                    left and aren't at their max friends), rather than using up interactions on people who can't.
+                    This changes the model (more friendships get made), see ActiveSet.py. Default: False
     """
-    def __init__(self, min_friends=3, max_friends=20, num_people=100, min_interactions=5, max_interactions=30):
+    def __init__(self, min_friends=3, max_friends=20, num_people=100, min_interactions=5, max_interactions=30,
+                 sampler="cumulative", track_separation=False, seed=None, like_score_dtype="float64",
+                 like_score_path=None, implicit_like_scores=False, like_score_cache_size=0, compatibility_index=None,
+                 skip_inactive=False):
 
         ### Simulation parameters ###
 
@@ -57,27 +154,144 @@ class Simulation:
         self.direct_friend_weight = 10
         self.fof_weight = 2
 
+        self.sampler = sampler
+        self.skip_inactive = skip_inactive
+
+        # Independent random streams for generating the population, for each day's interactions, and for the analytics
+        #   (so computing analytics, or when they are computed, never changes what happens in the simulation)
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        population_seed, day_seed, analytics_seed, like_score_seed = self.seed_sequence.spawn(4)
+        self.rng = np.random.default_rng(day_seed)
+        self.analytics_rng = np.random.default_rng(analytics_seed)
+
+        # We generate each person randomly. Their characteristics and preferences are randomly generated in Population.py
+        #   and stored as arrays. Each Person is a view onto their row of the population
+        population = Population.random(num_people, min_friends, max_friends, seed=population_seed)
+        self.__initialize(population, track_separation)
+
+        # Start between 0 and 0.8 for how much person_1 likes person_2 (consider this the personality modifier)
+        initial_score_range = (0.3, 0.9)
+
+        if implicit_like_scores:
+            # Nothing is stored, each pair's personality modifier comes from a hash keyed on the seed
+            like_score_key = like_score_seed.generate_state(1, np.uint64)[0]
+            self.like_scores = ImplicitLikeScores(self.population, like_score_key, initial_score_range,
+                                                  like_score_cache_size)
+        else:
+            # Initialize the like scores matrix with shape (num_people, num_people), a block of rows at a time so only
+            #   one block is ever held in float64
+            self.like_scores = LikeScores(num_people, like_score_dtype, like_score_path)
+            self.like_scores.fill(lambda start, stop: self.__calculate_like_score_rows(start, stop, initial_score_range))
+
+        # Whether each pair likes each other enough to be friends. Like scores and thresholds never change, so this
+        #   is usually worked out once, see CompatibilityIndex.py
+        if compatibility_index is None:
+            compatibility_index = not implicit_like_scores
+        if compatibility_index:
+            self.compatibility = CompatibilityIndex(self.like_scores, self.population.friend_threshold)
+        else:
+            self.compatibility = ImplicitCompatibility(self.like_scores, self.population.friend_threshold)
+
+    # Sets up everything that starts out empty and is built up as the simulation runs, for a population
+    def __initialize(self, population, track_separation):
+
+        num_people = self.num_people
+
         ### Initializations ###
 
         self.time_steps = 50
-        analytics_dictionaries = simulation_analysis_funcs.get_empty_analysis_dicts()
-        self.connectedness_dict = analytics_dictionaries["connectedness_dict"]
-        self.friend_group_dict = analytics_dictionaries["friend_group_dict"]
-        self.loner_dict = analytics_dictionaries["loner_dict"]
-        self.most_connected_dict = analytics_dictionaries["most_connected_dict"]
-        self.least_connected_dict = analytics_dictionaries["least_connected_dict"]
 
-        # We generate each person randomly. Their characteristics and preferences are randomly generated in Person.py
-        self.people = [Person(random.randint(min_friends, max_friends), person) for person in range(num_people)]
+        # The number of new friendships made each day, and the total number of friendships at the end of each day.
+        #   Any earlier day's friendships are the start of the friendship graph's edges (see replay_snapshots)
+        self.new_friendships_made = []
+        self.day_num_edges = []
 
-        # Initialize friendship set of tuples (friend_id_1, friend_id_2)
-        self.friendships = set()
+        # The day (starting at 0) from which nothing changes any more, once run_simulation has found it (see
+        #   stop_when_converged and quiet_days). Later days are not simulated
+        self.converged_day = None
 
-        # Start between 0 and 0.8 for how much person_1 likes person_2 (consider this the personality modifier)
-        initial_score_range = (0.3, 0.9)
+        # The results of each group of metrics on every day they have been computed for, see run_simulation's
+        #   analytics_schedule. A day's results are never computed twice
+        self.__analytics = {metric: dict() for metric in ANALYTICS_METRICS}
+
+        # The days each group of metrics should be computed for once its results are read
+        self.__on_demand_days = {metric: set() for metric in ANALYTICS_METRICS}
+
+        # The options run_simulation was given for the connectedness metrics
+        self.__connectedness_options = dict()
+
+        self.population = population
+
+        # Who is friends with who, see FriendshipGraph.py
+        self.friendship_graph = FriendshipGraph(num_people, self.max_friends)
+
+        # The friend groups (connected components), kept up to date as friendships are made, see FriendGroups.py
+        self.friend_groups = FriendGroups(num_people)
+
+        # Everyone's degrees of separation, kept up to date as friendships are made, see SeparationTracker.py
+        self.separation_tracker = SeparationTracker(num_people) if track_separation else None
+
+        self.people = [Person(self.population, person, self.friendship_graph) for person in range(num_people)]
+
+        # For each person, a weighted probability distribution for how likely they are to interact with everyone else
+        # For each common friend a person has with another, we add a bonus. For people who are already friends,
+        #   we will add a larger bonus
+        # The intended effect is that people will spend time with those that they already know, and are more likely
+        #   to meet friends-of-friends than total strangers. This should make friend groups more likely to form
+        # The weights are kept up to date as friendships are made, see InteractionWeights.py
+        # The sampler picks who each person interacts with from these probabilities, see interaction_samplers.py
+        if self.sampler == "cumulative":
+            self.interaction_weights = InteractionWeights(num_people, self.direct_friend_weight, self.fof_weight)
+            self.interaction_sampler = CumulativeSampler(self.interaction_weights, self.rng, self.skip_inactive)
+        elif self.sampler == "mixture":
+            self.interaction_weights = None
+            self.interaction_sampler = MixtureSampler(self.friendship_graph, self.direct_friend_weight, self.fof_weight,
+                                                      self.rng, self.skip_inactive)
+        else:
+            raise ValueError(f"Unknown sampler: {self.sampler}")
+
+    # Every friendship (friend_id_1, friend_id_2) as a (num_friendships x 2) array, in the order they were made
+    @property
+    def friendships(self):
+        return self.friendship_graph.edges
 
-        # Initialize the like scores matrix with shape (num_people, num_people)
-        self.like_scores = self.__calculate_like_scores(initial_score_range)
+    # The analytics results, in the format of simulation_analysis_funcs.get_empty_analysis_dicts. Reading these computes
+    #   any days that were scheduled "on_demand" and haven't been computed yet
+    @property
+    def connectedness_dict(self):
+        connectedness_dict = self.__get_analysis_dict("connectedness_dict", "connectedness")
+
+        # Recorded every day, whether or not there are analytics
+        connectedness_dict["new_friendships_made"][0].extend(self.new_friendships_made)
+        connectedness_dict["new_friendships_made"][3].extend(range(1, len(self.new_friendships_made) + 1))
+
+        return connectedness_dict
+
+    @property
+    def friend_group_dict(self):
+        return self.__get_analysis_dict("friend_group_dict", "friend_group")
+
+    @property
+    def loner_dict(self):
+        return self.__get_analysis_dict("loner_dict", "loners")
+
+    @property
+    def most_connected_dict(self):
+        return self.__get_analysis_dict("most_connected_dict", "connectedness", "most_connected")
+
+    @property
+    def least_connected_dict(self):
+        return self.__get_analysis_dict("least_connected_dict", "connectedness", "least_connected")
+
+    @property
+    def plugin_dict(self):
+        return self.__get_analysis_dict("plugin_dict", "plugins")
+
+    # Which mode ("exact" or "approximate") produced the connectedness numbers, for each day they were computed
+    @property
+    def connectedness_modes(self):
+        results = self.__get_results("connectedness")
+        return [results[day]["modes"] for day in sorted(results)]
 
     """
     Runs the simulation for the given number of days with the simulation's current status and parameters
@@ -85,43 +299,118 @@ class Simulation:
     num_days - The number of days to run the simulation for
     video_name - The name and output directory of the video to be created. If left empty, no video will be made
     show_loners - Whether or not to include loners in the visual graph
-    produce_analytics - Whether or not to produce analytics for the simulation
+    produce_analytics - Whether or not to produce every metric every day
+    analytics_schedule - When each group of metrics is computed, overriding produce_analytics. A dictionary with any of
+                         the keys "friend_group", "connectedness" (including the most/least connected people), "loners"
+                         and "plugins", each one of:
+        k (an integer) - every k days of the simulation (days k, 2k, ...), counted across runs, so a run split over
+                         several calls (or resumed from a checkpoint) computes its metrics on the same days
+        "final" - only on the last day of this run
+        "on_demand" - not during the run. The days of this run are computed (from the friendships each day ended with)
+                      the first time the metric's results are read, e.g. simulation.loner_dict
+        None - never
+    connectedness_modes - dictionary of "exact" or "approximate" for "avg_avg_deg_sep" and "max_distance", see
+                          simulation_analysis_funcs.get_connectedness_info. Default: both exact
+    num_separation_samples - how many people the approximate avg_avg_deg_sep searches from. Default: 256
+    workers - how many threads the connectedness breadth-first searches are spread over. Default: 1
+    verify_analytics - Whether to check the incrementally tracked degrees of separation against a full recompute each
+                       day (only does anything with track_separation=True)
+    day_engine - How each day is simulated. Default: "sequential"
+        "sequential" - people take turns in a random order and have their interactions one at a time (simulate_day)
+        "rounds" - turns are handed out in rounds and each round is resolved with arrays (simulate_day_rounds)
+    stop_when_converged - Whether to stop simulating once no more friendships can ever be made, i.e. no two people who
+                          are both under their max friends and not yet friends like each other enough (see
+                          has_converged). The remaining days are still counted, with no new friendships, and their
+                          analytics are copied from the last simulated day instead of being computed again
+    quiet_days - Also stop simulating (the same way) after this many days in a row without a new friendship, even if
+                 some could still be made. Default: None, never
     """
-    def run_simulation(self, num_days, video_name="", show_loners=False, produce_analytics=False):
+    def run_simulation(self, num_days, video_name="", show_loners=False, produce_analytics=False,
+                       day_engine="sequential", verify_analytics=False, connectedness_modes=None,
+                       num_separation_samples=256, analytics_schedule=None, stop_when_converged=False,
+                       quiet_days=None, workers=1):
         image_paths = []
 
-        for curr_day in range(num_days):
-            new_friendships_made = self.simulate_day()
-            self.connectedness_dict["new_friendships_made"][0].append(new_friendships_made)
-
-            if produce_analytics and len(self.friendships) > 1:
-
-                friend_group_info = simulation_analysis_funcs.get_friend_group_info(self)
-                connectedness_info = simulation_analysis_funcs.get_connectedness_info(self)
-                loner_info = simulation_analysis_funcs.get_loner_statistics(self)
-
-                for key, value in self.connectedness_dict.items():
-                    if key == "new_friendships_made":
-                        continue
-                    self.connectedness_dict[key][0].append(connectedness_info[key])
-
-                for key, value in self.friend_group_dict.items():
-                    self.friend_group_dict[key][0].append(friend_group_info[key])
-
-                for key, value in self.loner_dict.items():
-                    self.loner_dict[key][0].append(loner_info[key])
-
-                most_connected_person = connectedness_info["min_avg_deg_sep_person"]
-                least_connected_person = connectedness_info["max_avg_deg_sep_person"]
+        schedule = {metric: 1 if produce_analytics else None for metric in ANALYTICS_METRICS}
+        if analytics_schedule is not None:
+            schedule.update(analytics_schedule)
+
+        for metric, when in schedule.items():
+            if metric not in ANALYTICS_METRICS:
+                raise ValueError(f"Unknown analytics metric: {metric}")
+            if when not in (None, "final", "on_demand") and not (isinstance(when, int) and when > 0):
+                raise ValueError(f"Unknown analytics schedule for {metric}: {when}")
+
+        for key, mode in (connectedness_modes or dict()).items():
+            if key not in ("avg_avg_deg_sep", "max_distance"):
+                raise ValueError(f"Unknown connectedness metric: {key}")
+            if mode not in ("exact", "approximate"):
+                raise ValueError(f"Unknown mode for {key}: {mode}")
+
+        self.__connectedness_options = {"verify": verify_analytics, "modes": connectedness_modes,
+                                        "num_samples": num_separation_samples, "workers": workers}
+
+        if day_engine == "sequential":
+            simulate_day = self.simulate_day
+        elif day_engine == "rounds":
+            simulate_day = self.simulate_day_rounds
+        else:
+            raise ValueError(f"Unknown day engine: {day_engine}")
 
-                most_connected_stats = simulation_analysis_funcs.get_individual_statistics(most_connected_person)
-                least_connected_stats = simulation_analysis_funcs.get_individual_statistics(least_connected_person)
+        # Stopped in an earlier run. That only still holds if no friendship can be made any more and this run stops on
+        #   convergence, or this run's quiet_days have gone by without a new friendship
+        if self.converged_day is not None:
+            still_converged = stop_when_converged and self.has_converged()
+            still_quiet = quiet_days is not None and len(self.new_friendships_made) >= quiet_days and \
+                not any(self.new_friendships_made[-quiet_days:])
+            if not (still_converged or still_quiet):
+                self.converged_day = None
 
-                for key, value in self.most_connected_dict.items():
-                    self.most_connected_dict[key][0].append(most_connected_stats[key])
+        # The results of each metric on the converged friendships, shared by every day after the convergence
+        converged_results = dict()
 
-                for key, value in self.least_connected_dict.items():
-                    self.least_connected_dict[key][0].append(least_connected_stats[key])
+        for curr_day in range(num_days):
+            # Nothing can change any more, so the day doesn't need simulating
+            if self.converged_day is not None:
+                new_friendships_made = 0
+            else:
+                new_friendships_made = simulate_day()
+
+            self.new_friendships_made.append(new_friendships_made)
+            self.day_num_edges.append(self.friendship_graph.num_edges)
+
+            # Friendships can only have run out on a day none were made, so that is the only time it is checked
+            if self.converged_day is None:
+                quiet = quiet_days is not None and len(self.new_friendships_made) >= quiet_days and \
+                    not any(self.new_friendships_made[-quiet_days:])
+                if quiet or (stop_when_converged and new_friendships_made == 0 and self.has_converged()):
+                    self.converged_day = len(self.day_num_edges) - 1
+
+            if self.friendship_graph.num_edges > 1:
+                day = len(self.day_num_edges) - 1
+                due_metrics = []
+
+                for metric, when in schedule.items():
+                    if when == "on_demand":
+                        self.__on_demand_days[metric].add(day)
+                    elif (when == "final" and curr_day == num_days - 1) or \
+                            (isinstance(when, int) and (day + 1) % when == 0):
+                        due_metrics.append(metric)
+
+                # After convergence, every day has the same friendships, so anything already computed is copied
+                if self.converged_day is not None and day > self.converged_day:
+                    for metric in [metric for metric in due_metrics if metric in converged_results]:
+                        self.__analytics[metric][day] = converged_results[metric]
+                        due_metrics.remove(metric)
+
+                if due_metrics:
+                    # Everything the metrics need about today's friendships, built once and shared between them
+                    snapshot = AnalyticsSnapshot(self, day)
+
+                    for metric in due_metrics:
+                        self.__analytics[metric][day] = self.__compute_metrics(metric, snapshot)
+                        if self.converged_day is not None:
+                            converged_results[metric] = self.__analytics[metric][day]
 
             if video_name:
                 curr_day_str = ("0" * (5 - len(str(curr_day)) % 5)) + str(curr_day)
@@ -140,184 +429,314 @@ class Simulation:
             for img_path in image_paths:
                 os.remove(img_path)
 
+    # Returns whether no more friendships can ever be made: no two people who are both under their max friends, and
+    #   aren't friends yet, are compatible. Anyone can meet anyone, so otherwise they would become friends eventually
+    def has_converged(self):
+        degree = self.friendship_graph.degree
+        unsaturated = degree < self.population.max_friends
+        unsaturated_people = np.flatnonzero(unsaturated)
+        if len(unsaturated_people) < 2:
+            return True
+
+        # Every friendship is between compatible people, so any compatible pairs beyond the friendships (counted in
+        #   both directions) aren't friends yet
+        edges = self.friendships
+        num_unsaturated_friendships = np.count_nonzero(unsaturated[edges[:, 0]] & unsaturated[edges[:, 1]])
+
+        return self.compatibility.count_compatible_pairs(unsaturated_people) == 2 * num_unsaturated_friendships
+
+    # Computes one group of metrics (see ANALYTICS_METRICS) from a day's AnalyticsSnapshot
+    # Return - Dictionary of the results
+    def __compute_metrics(self, metric, snapshot):
+        if metric == "friend_group":
+            return simulation_analysis_funcs.get_friend_group_info(self, snapshot)
+        elif metric == "loners":
+            return simulation_analysis_funcs.get_loner_statistics(self, snapshot)
+        elif metric == "plugins":
+            return simulation_analysis_funcs.get_plugin_info(snapshot)
+
+        connectedness_info = simulation_analysis_funcs.get_connectedness_info(self, snapshot, rng=self.analytics_rng,
+                                                                              **self.__connectedness_options)
+
+        most_connected_person = connectedness_info["min_avg_deg_sep_person"]
+        least_connected_person = connectedness_info["max_avg_deg_sep_person"]
+        connectedness_info["most_connected"] = simulation_analysis_funcs.get_individual_statistics(most_connected_person)
+        connectedness_info["least_connected"] = simulation_analysis_funcs.get_individual_statistics(least_connected_person)
+
+        return connectedness_info
+
+    # Computes any on-demand days of a group of metrics that haven't been computed yet
+    # Return - Dictionary from day to the results of that day
+    def __get_results(self, metric):
+        results = self.__analytics[metric]
+        missing_days = self.__on_demand_days[metric] - results.keys()
+        self.__on_demand_days[metric].clear()
+
+        # The current friendships don't need replaying
+        current_day = len(self.day_num_edges) - 1
+        if current_day in missing_days:
+            missing_days.remove(current_day)
+            results[current_day] = self.__compute_metrics(metric, AnalyticsSnapshot(self, current_day))
+
+        for snapshot in replay_snapshots(self, missing_days):
+            results[snapshot.day] = self.__compute_metrics(metric, snapshot)
+
+        return results
+
+    # Return - The analysis dictionary dict_name (see simulation_analysis_funcs.get_empty_analysis_dicts) filled with the
+    #   results of a group of metrics. results_key picks out a nested dictionary of the results
+    def __get_analysis_dict(self, dict_name, metric, results_key=None):
+        analysis_dict = simulation_analysis_funcs.get_empty_analysis_dicts()[dict_name]
+        results = self.__get_results(metric)
+
+        for day in sorted(results):
+            day_results = results[day] if results_key is None else results[day][results_key]
+
+            # A plugin registered part way through only has results from then on
+            for key, value in analysis_dict.items():
+                if key in day_results:
+                    value[0].append(day_results[key])
+                    value[3].append(day + 1)
+
+        return analysis_dict
+
     # Simulates a day of people meeting each other
     # Return - Number of new friendships made
     def simulate_day(self, analytics=False):
         num_new_friendships = 0
 
-        interaction_probs = self.__calculate_interaction_probabilities()
+        population = self.population
+        friendship_graph = self.friendship_graph
+        compatibility = self.compatibility
+        degree = friendship_graph.degree
+        max_friends = population.max_friends
 
         # The number of interactions each person will have that day
-        interactions_left = np.random.randint(low=self.min_interactions,
+        interactions_left = self.rng.integers(low=self.min_interactions,
                                               high=self.max_interactions,
                                               size=self.num_people)
 
-        # People who have interactions_left >= 1
-        socializing_people = [i for i in range(self.num_people)]
+        # People who have interactions_left >= 1 and can still make friends. People drop out as they run out of either
+        socializing_people = ActiveSet(self.num_people, np.flatnonzero((interactions_left > 0) & (degree < max_friends)))
+
+        # Fix everyone's interaction probabilities for today
+        self.interaction_sampler.prepare_day(socializing_people)
 
         # We don't want to accidentally prioritize people with small IDs, so we shuffle
-        interaction_order = [i for i in range(self.num_people)]
-        random.shuffle(interaction_order)
+        # Anyone who can't make friends today won't take a turn, so they aren't looped over
+        interaction_order = self.rng.permutation(self.num_people)
+        interaction_order = interaction_order[socializing_people.contains_batch(interaction_order)].tolist()
 
         for person_idx in interaction_order:
             # They are the only person left still wanting to do anything...
-            if len(socializing_people) == 1:
+            if len(socializing_people) <= 1:
                 break
 
-            person = self.people[person_idx]
-
-            # Skip this person if they've already met their max friends
-            if len(person.friends) == person.max_friends:
+            # Skip this person if they've already met their max friends or had their maximum interactions for the day
+            if person_idx not in socializing_people:
                 continue
-            
+
             # How many more people will this person interact with today?
             num_interactions = interactions_left[person_idx]
 
-            # Skip this person if they have already had their maximum interactions for the day
-            if num_interactions == 0:
-                continue
-
-            # Randomly pick the people that this person will interact with based on their probabilities
-            people_interacted_with = np.random.choice(a=self.people,
-                                                      size=num_interactions,
-                                                      p=interaction_probs[person_idx])
+            # Randomly pick the ids of the people that this person will interact with based on their probabilities
+            # Interactions that couldn't find anyone who can still make friends today are -1, and don't happen
+            people_interacted_with = self.interaction_sampler.sample(person_idx, num_interactions)
 
             # Loop through all people that they interact with
-            for person_interacted_with in people_interacted_with:
-                
+            for candidate_idx in people_interacted_with[people_interacted_with >= 0].tolist():
                 # Subtract the interaction from you
                 interactions_left[person_idx] -= 1
 
                 # person_idx wanted to hang out with the other person, but the other person was tired...
-                if interactions_left[person_interacted_with.id] == 0:
+                if interactions_left[candidate_idx] == 0:
                     continue
 
                 # Both people hang out
-                interactions_left[person_interacted_with.id] -= 1
-                
-                # If they are already friends, continue
-                if (person_idx, person_interacted_with.id) in self.friendships:
-                    continue
-                if (person_interacted_with.id, person_idx) in self.friendships:
-                    continue
+                interactions_left[candidate_idx] -= 1
+                if interactions_left[candidate_idx] == 0:
+                    socializing_people.remove(candidate_idx)
 
-                # They are not friends, so they could possibly become friends
-
-                # Ensure neither party is at their max friend count
-                if len(self.people[person_idx].friends) == self.people[person_idx].max_friends:
+                # Ensure neither party is at their max friend count. Late on most people are, so this is checked
+                #   before anything more expensive
+                if degree[person_idx] == max_friends[person_idx]:
                     continue
-                if len(person_interacted_with.friends) == person_interacted_with.max_friends:
+                if degree[candidate_idx] == max_friends[candidate_idx]:
                     continue
 
-                # See if they like each other enough
-                person_to_candidate_score = self.like_scores[person_idx][person_interacted_with.id]
-                candidate_to_person_score = self.like_scores[person_interacted_with.id][person_idx]
-
-                if person_to_candidate_score < person.friend_threshold:
+                # If they are already friends, continue
+                if friendship_graph.are_friends(person_idx, candidate_idx):
                     continue
 
-                if candidate_to_person_score < person_interacted_with.friend_threshold:
+                # They are not friends, so they could possibly become friends
+
+                # See if they like each other enough
+                if not compatibility.are_compatible(person_idx, candidate_idx):
                     continue
 
                 # If we've made it here, they like each other enough to become friends
-                person.friends.append(person_interacted_with.id)
-                person_interacted_with.friends.append(person_idx)
-
-                self.friendships.add((person.id, person_interacted_with.id))
+                self.__add_friendship(person_idx, candidate_idx)
                 num_new_friendships += 1
 
-        return num_new_friendships
-
-    # For each person, create a weighted probability distribution for how likely they are to interact with everyone else
-    # For each common friend a person has with another, we add a bonus. For people who are already friends,
-    #   we will add a larger bonus
-    # The intended effect is that people will spend time with those that they already know, and are more likely
-    #   to meet friends-of-friends than total strangers. This should make friend groups more likely to form
-    def __calculate_interaction_probabilities(self):
-        # Create the (num_people x num_people) matrix, weights start at one so people can meet strangers
-        interaction_weights = np.ones((self.num_people, self.num_people))
-
-        for person_idx in range(self.num_people):
-            curr_person = self.people[person_idx]
+                # Anyone who has reached their max friends can't make any more today
+                if degree[candidate_idx] == max_friends[candidate_idx]:
+                    socializing_people.remove(candidate_idx)
 
-            individual_interaction_weights = np.zeros(self.num_people)
+            # Their turn is over, so they can only be someone else's partner from now on, if they have interactions
+            #   left and room for more friends
+            if interactions_left[person_idx] == 0 or degree[person_idx] == max_friends[person_idx]:
+                socializing_people.remove(person_idx)
 
-            # Get all the people reachable in two steps (friend of a friend)
-            #   Note: There may be repetitions and overlap with their direct friends
-            # Also add direct-friend interaction weights
-            reachable_in_two = np.zeros(self.num_people)
-            for direct_friend_idx in curr_person.friends:
-                # Add weight for being friends with this person
-                individual_interaction_weights[direct_friend_idx] += self.direct_friend_weight
-
-                # Find their friends-of-friends
-                for friend_of_friend_idx in self.people[direct_friend_idx].friends:
-                    reachable_in_two[friend_of_friend_idx] += 1
-
-            # Add the friend-of-friend weights
-            for fof_idx in range(self.num_people):
-                individual_interaction_weights[fof_idx] += (reachable_in_two[fof_idx] * self.fof_weight)
-
-            # Zero out this persons entry (-1 because we are adding it to a matrix of 1s)
-            individual_interaction_weights[person_idx] = -1
-
-            # Add the weights to the matrix
-            interaction_weights[person_idx] += individual_interaction_weights
+        return num_new_friendships
 
-        # Normalize each row to be probabilities
-        for row in range(self.num_people):
-            total_weight = np.sum(interaction_weights[row])
-            interaction_weights[row] /= total_weight
+    # Simulates a day of people meeting each other, like simulate_day, but in rounds instead of one person at a time
+    # Everyone takes their turn in a random order like simulate_day, but the turns are handed out in num_rounds
+    #   rounds, and everyone in a round has all of their interactions at once as arrays. Proposals are ranked in turn
+    #   order, which decides conflicts the same way taking turns would: an interaction only happens if both people
+    #   still have interactions left after everything ranked before it, and new friendships are accepted in rank
+    #   order while both people have room for more friends.
+    # num_rounds - how many rounds the turns are split into. More rounds is closer to simulate_day, fewer is faster
+    # Return - Number of new friendships made
+    def simulate_day_rounds(self, num_rounds=10):
+        num_new_friendships = 0
 
-        return interaction_weights
+        population = self.population
+        degree = self.friendship_graph.degree
+        max_friends = population.max_friends
 
-    # Calculate how much everyone likes each other based off of their characteristics and preferences
-    def __calculate_like_scores(self, initial_score_range):
-        # Initialize like score matrix
-        like_scores = [[0 for _ in range(self.num_people)] for _ in range(self.num_people)]
+        # The number of interactions each person will have that day
+        interactions_left = self.rng.integers(low=self.min_interactions,
+                                              high=self.max_interactions,
+                                              size=self.num_people)
 
-        # Loop through every possible person_1 --> person_2 connection
-        for person_1 in range(self.num_people):
-            for person_2 in range(self.num_people):
-                # A person will not become friends with themselves
-                if person_1 == person_2:
-                    continue
+        # People who have interactions left and can still make friends, see simulate_day
+        socializing_people = ActiveSet(self.num_people, np.flatnonzero((interactions_left > 0) & (degree < max_friends)))
 
-                initial_score = random.uniform(initial_score_range[0], initial_score_range[1])
+        # Fix everyone's interaction probabilities for today
+        self.interaction_sampler.prepare_day(socializing_people)
 
-                # Get the actual Person objects
-                person_1_obj = self.people[person_1]
-                person_2_obj = self.people[person_2]
+        # We don't want to accidentally prioritize people with small IDs, so we shuffle
+        interaction_order = self.rng.permutation(self.num_people)
 
-                # See how much person_1 prefers person_2's gender
-                gender_modifier = person_1_obj.preferences["gender"][person_2_obj.characteristics["gender"]]
+        for round_people in np.array_split(interaction_order, num_rounds):
+            # No one is left to make friends with
+            if len(socializing_people) <= 1:
+                break
 
-                # Subtract the age by 18 since the list index starts at 0
-                age_modifier = person_1_obj.preferences["age"][person_2_obj.characteristics["age"] - 18]
+            # Skip people who have already met their max friends or have no interactions left
+            round_people = round_people[socializing_people.contains_batch(round_people)]
+            if len(round_people) == 0:
+                continue
 
-                # See how much person_1 prefers person_2's race
-                race_modifier = person_1_obj.preferences["race"][person_2_obj.characteristics["race"]]
+            # Everyone in the round proposes all of their interactions, in turn order. Proposals that couldn't find
+            #   anyone who can still make friends today don't happen
+            proposers = np.repeat(round_people, interactions_left[round_people])
+            partners = self.interaction_sampler.sample_batch(proposers)
+            proposers, partners = proposers[partners >= 0], partners[partners >= 0]
+            priority = np.arange(len(proposers))
+
+            # A proposal happens if the proposer still has an interaction left by then (they may have been someone
+            #   else's partner earlier in the round), and the partner hangs out if they still have one too
+            proposed = rank_within_groups(proposers, priority, partners) < interactions_left[proposers]
+            accepted = proposed & (rank_within_groups(partners, priority, proposers) < interactions_left[partners])
+
+            interactions_left -= np.bincount(proposers[proposed], minlength=self.num_people)
+            interactions_left -= np.bincount(partners[accepted], minlength=self.num_people)
+
+            person_1 = proposers[accepted]
+            person_2 = partners[accepted]
+            priority = priority[accepted]
+
+            # They could become friends if neither is at their max friends and they like each other enough
+            could_befriend = (degree[person_1] < max_friends[person_1]) & (degree[person_2] < max_friends[person_2])
+            could_befriend &= self.compatibility.are_compatible_batch(person_1, person_2)
+            person_1, person_2, priority = person_1[could_befriend], person_2[could_befriend], priority[could_befriend]
+
+            # Skip anyone who is already friends, and only count a pair once if they met more than once
+            not_friends = ~self.friendship_graph.are_friends_batch(person_1, person_2)
+            pair_keys = np.minimum(person_1, person_2) * self.num_people + np.maximum(person_1, person_2)
+            keep = not_friends & (rank_within_groups(pair_keys, priority) == 0)
+            person_1, person_2, priority = person_1[keep], person_2[keep], priority[keep]
+
+            # Accept friendships in rank order while both people have room for more friends. Anything ranked within
+            #   both people's remaining room is certainly accepted, so each pass settles at least the top-ranked pair
+            while len(person_1) > 0:
+                room_left = max_friends - degree
+                fits = (rank_within_groups(person_1, priority, person_2) < room_left[person_1]) & \
+                       (rank_within_groups(person_2, priority, person_1) < room_left[person_2])
+
+                for pair_1, pair_2 in zip(person_1[fits].tolist(), person_2[fits].tolist()):
+                    self.__add_friendship(pair_1, pair_2)
+                    num_new_friendships += 1
+
+                # Drop the accepted pairs and any pair where someone just ran out of room
+                undecided = ~fits & (degree[person_1] < max_friends[person_1]) & (degree[person_2] < max_friends[person_2])
+                person_1, person_2, priority = person_1[undecided], person_2[undecided], priority[undecided]
+
+            # Everyone who ran out of interactions or reached their max friends this round drops out
+            involved = np.concatenate((proposers, partners))
+            socializing_people.remove_batch(involved[(interactions_left[involved] == 0) |
+                                                     (degree[involved] == max_friends[involved])])
 
-                # See how much person_1 likes person_2's hobbies
-                hobby_modifier = 0
-                for hobby in person_2_obj.characteristics["hobbies"]:
-                    hobby_modifier += person_1_obj.preferences["hobbies"][hobby]
+        return num_new_friendships
 
-                # The total score is the sum of the initial and all the modifiers
-                total_like_score = initial_score + gender_modifier + age_modifier + race_modifier + hobby_modifier
-                like_scores[person_1][person_2] = total_like_score
+    # Records a new friendship between person_1 and person_2 everywhere it needs to be tracked
+    def __add_friendship(self, person_1, person_2):
+        # The interaction weights need their friends from before this friendship
+        if self.interaction_weights is not None:
+            self.interaction_weights.add_friendship(person_1, person_2,
+                                                    self.friendship_graph.friends_of(person_1),
+                                                    self.friendship_graph.friends_of(person_2))
+
+        self.friendship_graph.add_friendship(person_1, person_2)
+        self.friend_groups.add_friendship(person_1, person_2)
+        if self.separation_tracker is not None:
+            self.separation_tracker.add_friendship(person_1, person_2)
+
+    # Calculate how much people start:stop like everyone else based off of their characteristics and preferences
+    # Rather than looping over every person_1 --> person_2 pair, we read everyone's characteristics and preferences
+    #   straight from the population arrays and build the rows start:stop of the matrix at once.
+    #   like_scores[person_1][person_2] is how much person_1 likes person_2
+    # The rows are drawn in order, so building the matrix in blocks gives the same scores as building it all at once
+    def __calculate_like_score_rows(self, start, stop, initial_score_range):
+        population = self.population
+        rows = slice(start, stop)
+
+        # Rows are person_1 (whose preferences we use), columns are person_2 (whose characteristics we look at)
+        age = population.age.astype(np.int32)
+        same_gender = population.gender[rows, None] == population.gender[None, :]
+        same_race = population.race[rows, None] == population.race[None, :]
+
+        # The number of hobbies each pair has in common
+        hobbies = population.hobby_matrix()
+        common_hobbies = hobbies[rows] @ hobbies.T
+
+        # The personality modifier for every pair, drawn all at once
+        like_scores = self.rng.uniform(initial_score_range[0], initial_score_range[1],
+                                       size=(stop - start, self.num_people))
+
+        # See how much person_1 prefers person_2's gender
+        like_scores += np.where(same_gender,
+                                population.same_gender_pref[rows, None], population.opposite_gender_pref[rows, None])
+
+        # The same-age bonus minus the penalty for each year of age difference
+        like_scores += population.same_age_pref[rows, None]
+        like_scores -= np.abs(age[rows, None] - age[None, :]) * population.age_diff_pref[rows, None]
+
+        # See how much person_1 prefers person_2's race
+        like_scores += np.where(same_race, population.same_race_pref[rows, None], population.other_race_pref[rows, None])
+
+        # See how much person_1 likes person_2's hobbies
+        like_scores += common_hobbies * population.same_hobby_pref[rows, None]
+
+        # A person will not become friends with themselves
+        like_scores[np.arange(stop - start), np.arange(start, stop)] = 0
 
         return like_scores
 
     # Creates a Networkx graph and draws the friendships between people
     def visualize_curr_friendships(self, show_graph=True, show_loners=True, save_img_path=""):
-        friendship_graph = nx.Graph()
-
-        if show_loners:
-            friendship_graph.add_nodes_from(range(self.num_people))
-            friendship_graph.add_edges_from(self.friendships)
-        else:
-            friendship_graph.add_edges_from(self.friendships)
+        friendship_graph = self.friendship_graph.to_networkx(include_loners=show_loners)
 
         # This allows us to get the most popular person and make them red
         node_and_degree = friendship_graph.degree()
@@ -340,11 +759,11 @@ class Simulation:
         color_race_map[5] = "#00AA66"
 
         colors = []
-        for person in self.people:
-            if not show_loners and len(person.friends) == 0:
+        for person_idx in range(self.num_people):
+            if not show_loners and self.friendship_graph.degree[person_idx] == 0:
                 continue
 
-            colors.append(color_race_map[person.characteristics["race"]])
+            colors.append(color_race_map[self.population.race[person_idx]])
 
         nx.draw(friendship_graph, pos, node_color=colors, node_size=50, with_labels=False)
 
@@ -411,28 +830,126 @@ class Simulation:
                 print("\t", person, file=file)
                 print("\tFriends:", person.friends, file=file)
 
+    # Every statistic computed so far as NumPy columns by day, see ResultsStore.py
+    @property
+    def results(self):
+        return ResultsStore.from_simulation(self)
+
+    # Saves every statistic computed so far to a .npz file, load it with ResultsStore.load
+    def save_results(self, path):
+        self.results.save(path)
+
+    # Saves everything needed to carry on the simulation later to a checkpoint directory at path: the population, like
+    #   scores, compatibility, friendships, random number generator states and every analytics result so far
+    # The arrays are saved as .npy files so load_checkpoint can memory-map them, everything else as checkpoint.json
+    def save_checkpoint(self, path):
+        os.makedirs(path, exist_ok=True)
+
+        arrays = {f"population_{name}": array for name, array in self.population.arrays().items()}
+        arrays["friendships"] = self.friendships
+
+        # Implicit like scores are worked out again from their key, and without a CompatibilityIndex there are no bits
+        implicit_like_scores = isinstance(self.like_scores, ImplicitLikeScores)
+        if not implicit_like_scores:
+            arrays["like_scores"] = self.like_scores.scores
+        if isinstance(self.compatibility, CompatibilityIndex):
+            arrays["compatibility_bits"] = self.compatibility.bits
+            arrays["num_compatible"] = self.compatibility.num_compatible
+
+        # Each file is written next to the old one and then moved over it, so saving a simulation loaded from this
+        #   checkpoint never overwrites the files its arrays are memory-mapped from
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.tmp.npy"), array)
+            os.replace(os.path.join(path, f"{name}.tmp.npy"), os.path.join(path, f"{name}.npy"))
+
+        checkpoint = {
+            "params": {"min_friends": self.min_friends, "max_friends": self.max_friends, "num_people": self.num_people,
+                       "min_interactions": self.min_interactions, "max_interactions": self.max_interactions,
+                       "direct_friend_weight": self.direct_friend_weight, "fof_weight": self.fof_weight,
+                       "sampler": self.sampler, "skip_inactive": self.skip_inactive,
+                       "track_separation": self.separation_tracker is not None},
+            "arrays": list(arrays),
+            "implicit_like_scores": {"key": self.like_scores.key,
+                                     "initial_score_range": list(self.like_scores.initial_score_range),
+                                     "cache_size": self.like_scores.cache_size} if implicit_like_scores else None,
+            "seed_sequence": {"entropy": self.seed_sequence.entropy, "spawn_key": list(self.seed_sequence.spawn_key),
+                              "pool_size": self.seed_sequence.pool_size,
+                              "n_children_spawned": self.seed_sequence.n_children_spawned},
+            "rng_state": self.rng.bit_generator.state,
+            "analytics_rng_state": self.analytics_rng.bit_generator.state,
+            "new_friendships_made": self.new_friendships_made,
+            "day_num_edges": self.day_num_edges,
+            "converged_day": self.converged_day,
+            "analytics": _results_to_json(self.__analytics),
+            "on_demand_days": {metric: sorted(days) for metric, days in self.__on_demand_days.items()},
+            "connectedness_options": _results_to_json(self.__connectedness_options),
+        }
+
+        with open(os.path.join(path, "checkpoint.tmp.json"), "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(os.path.join(path, "checkpoint.tmp.json"), os.path.join(path, "checkpoint.json"))
+
+    # Loads a simulation saved with save_checkpoint. Running it on gives exactly the same days as if it had never stopped
+    # The like scores and compatibility are memory-mapped (read-only) rather than read in, so loading is fast
+    @classmethod
+    def load_checkpoint(cls, path):
+        with open(os.path.join(path, "checkpoint.json")) as file:
+            checkpoint = json.load(file)
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in checkpoint["arrays"]}
+
+        simulation = cls.__new__(cls)
+        params = checkpoint["params"]
+        for name in ("min_friends", "max_friends", "num_people", "min_interactions", "max_interactions",
+                     "direct_friend_weight", "fof_weight", "sampler", "skip_inactive"):
+            setattr(simulation, name, params[name])
+
+        seed_sequence = checkpoint["seed_sequence"]
+        simulation.seed_sequence = np.random.SeedSequence(seed_sequence["entropy"],
+                                                          spawn_key=seed_sequence["spawn_key"],
+                                                          pool_size=seed_sequence["pool_size"],
+                                                          n_children_spawned=seed_sequence["n_children_spawned"])
+        simulation.rng = np.random.default_rng()
+        simulation.rng.bit_generator.state = checkpoint["rng_state"]
+        simulation.analytics_rng = np.random.default_rng()
+        simulation.analytics_rng.bit_generator.state = checkpoint["analytics_rng_state"]
+
+        # The population is small and its arrays are written to, so it is read in rather than memory-mapped
+        population = Population.from_arrays({name[len("population_"):]: np.array(array)
+                                             for name, array in arrays.items() if name.startswith("population_")})
+        simulation.__initialize(population, params["track_separation"])
+
+        implicit_like_scores = checkpoint["implicit_like_scores"]
+        if implicit_like_scores is None:
+            simulation.like_scores = LikeScores.from_array(arrays["like_scores"])
+        else:
+            simulation.like_scores = ImplicitLikeScores(population, implicit_like_scores["key"],
+                                                        tuple(implicit_like_scores["initial_score_range"]),
+                                                        implicit_like_scores["cache_size"])
+
+        if "compatibility_bits" in arrays:
+            simulation.compatibility = CompatibilityIndex.from_bits(arrays["compatibility_bits"],
+                                                                    arrays["num_compatible"])
+        else:
+            simulation.compatibility = ImplicitCompatibility(simulation.like_scores, population.friend_threshold)
+
+        # The friendships are made again in the same order, which rebuilds the friend groups, interaction weights and
+        #   degrees of separation exactly as they were
+        for person_1, person_2 in arrays["friendships"].tolist():
+            simulation.__add_friendship(person_1, person_2)
+
+        simulation.new_friendships_made = checkpoint["new_friendships_made"]
+        simulation.day_num_edges = checkpoint["day_num_edges"]
+        simulation.converged_day = checkpoint["converged_day"]
+        simulation.__analytics = _results_from_json(checkpoint["analytics"], simulation.people)
+        simulation.__on_demand_days = {metric: set(days) for metric, days in checkpoint["on_demand_days"].items()}
+        simulation.__connectedness_options = _results_from_json(checkpoint["connectedness_options"], simulation.people)
+
+        return simulation
+
     def print_analysis(self):
         with open("simulation_analysis.txt", "w") as file:
-            i = 1
-            print("Simulation Analysis:", file=file)
-            for key, value in self.connectedness_dict.items():
-                print(value[1] + " Over Time", file=file)
-                for number in value[0]:
-                    print(f"\t\tDay {i}: {number}", file=file)
-                    i = i + 1
-                i = 1
-            for key, value in self.friend_group_dict.items():
-                print(value[1] + " Over Time", file=file)
-                for number in value[0]:
-                    print(f"\t\tDay {i}: {number}", file=file)
-                    i = i + 1
-                i = 1
-            for key, value in self.loner_dict.items():
-                print(value[1] + " Over Time", file=file)
-                for number in value[0]:
-                    print(f"\t\tDay {i}: {number}", file=file)
-                    i = i + 1
-                i = 1
+            self.results.write_report(file)
 
 
 if __name__ == "__main__":
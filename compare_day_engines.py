@@ -0,0 +1,65 @@
+# Compares the sequential day engine (Simulation.simulate_day) with the round-based one
+#   (Simulation.simulate_day_rounds) by running both many times on the same parameters and comparing
+#   their averages. The round-based engine should make friends at the same rate as the sequential one
+
+import sys
+
+import numpy as np
+
+import simulation_analysis_funcs
+from Simulation import Simulation
+
+# Parameters for the sim
+num_people = 100
+num_days = 14
+min_interactions = 5
+max_interactions = 15
+max_friends = 25
+
+num_simulations = 80
+
+# How many standard errors apart the averages can be before we say the engines differ
+max_standard_errors = 3
+
+results = dict()
+for day_engine in ["sequential", "rounds"]:
+    print(f"Running {num_simulations} simulations with the {day_engine} day engine")
+
+    total_friendships = []
+    total_loners = []
+    for curr_simulation in range(num_simulations):
+        # Both engines get the same seeds, so they start from the same populations
+        new_sim = Simulation(num_people=num_people, min_interactions=min_interactions,
+                             max_interactions=max_interactions, max_friends=max_friends, seed=curr_simulation)
+        new_sim.run_simulation(num_days, day_engine=day_engine)
+
+        total_friendships.append(new_sim.friendship_graph.num_edges)
+        total_loners.append(len(simulation_analysis_funcs.get_loners(new_sim)))
+
+    results[day_engine] = {
+        "total_friendships": np.array(total_friendships),
+        "total_loners": np.array(total_loners),
+    }
+
+# Compare the averages of each statistic. Run i of both engines starts from the same population, so the runs are
+#   compared in pairs, which takes out the spread between populations and gives a much tighter standard error
+engines_match = True
+for key in results["sequential"].keys():
+    sequential = results["sequential"][key]
+    rounds = results["rounds"][key]
+
+    differences = sequential - rounds
+    standard_error = differences.std(ddof=1) / np.sqrt(len(differences))
+    num_standard_errors = abs(sequential.mean() - rounds.mean()) / standard_error if standard_error > 0 else 0
+
+    print(f"\t{key}: sequential {sequential.mean():.2f}, rounds {rounds.mean():.2f} "
+          f"({num_standard_errors:.2f} standard errors apart)")
+
+    if num_standard_errors > max_standard_errors:
+        engines_match = False
+
+if engines_match:
+    print("The day engines match")
+else:
+    print("The day engines DO NOT match")
+    sys.exit(1)
@@ -0,0 +1,206 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from Simulation import Simulation
+from ResultsStore import ResultsStore
+import simulation_analysis_funcs
+from streaming_statistics import EnsembleStatistics
+
+
+# The statistics an ensemble run sends back by default, only the last day is computed
+FINAL_DAY_SCHEDULE = {"friend_group": "final", "connectedness": "final", "loners": "final", "plugins": "final"}
+
+# The statistics an ensemble run computes when its per-day curves are wanted
+DAILY_SCHEDULE = {"friend_group": 1, "connectedness": 1, "loners": 1, "plugins": 1}
+
+
+def get_final_day_statistics(simulation):
+    """
+    Returns the last computed value of every statistic of a simulation, as a dictionary from the analysis dictionary
+    names (see simulation_analysis_funcs.get_empty_analysis_dicts) to dictionaries of statistic --> value
+
+    Statistics that were never computed are left out, so this is small enough to send between processes
+    """
+    final_statistics = dict()
+
+    for dict_name in simulation_analysis_funcs.ANALYSIS_DICT_NAMES:
+        analysis_dict = getattr(simulation, dict_name)
+        final_statistics[dict_name] = {key: value[0][-1] for key, value in analysis_dict.items() if value[0]}
+
+    return final_statistics
+
+
+def get_daily_curves(simulation):
+    """
+    Returns every statistic of a simulation over every day it has run, in the same layout as get_final_day_statistics.
+    Each statistic is an array with one entry per day (or one row, for the distributions), with nan on days it wasn't
+    computed
+    """
+    num_days = len(simulation.day_num_edges)
+    daily_curves = dict()
+
+    for dict_name in simulation_analysis_funcs.ANALYSIS_DICT_NAMES:
+        daily_curves[dict_name] = dict()
+
+        for key, (values, title, label, days) in getattr(simulation, dict_name).items():
+            if not values:
+                continue
+
+            values = np.array(values, dtype=np.float64)
+            curve = np.full((num_days,) + values.shape[1:], np.nan)
+            curve[np.array(days) - 1] = values
+            daily_curves[dict_name][key] = curve
+
+    return daily_curves
+
+
+def run_ensemble_member(params, num_days, analytics_schedule, seed_sequence, stop_when_converged=True):
+    """
+    Runs one simulation of an ensemble and returns its final day statistics (see get_final_day_statistics)
+
+    params - keyword arguments for the Simulation
+    num_days - how many days to run the simulation for
+    analytics_schedule - which statistics to compute, see Simulation.run_simulation
+    seed_sequence - the np.random.SeedSequence this run draws all of its randomness from
+    stop_when_converged - whether to stop simulating once no more friendships can be made, see
+                          Simulation.run_simulation. Default: True
+    """
+    # Every run draws from its own seed, so its results don't depend on which process it ends up in
+    simulation = Simulation(**params, seed=seed_sequence)
+    simulation.run_simulation(num_days, analytics_schedule=analytics_schedule, stop_when_converged=stop_when_converged)
+
+    return get_final_day_statistics(simulation)
+
+
+def run_ensemble_member_curves(params, num_days, analytics_schedule, seed_sequence, stop_when_converged=True):
+    """
+    Runs one simulation of an ensemble and returns its statistics over every day (see get_daily_curves). Arguments
+    are the same as run_ensemble_member
+    """
+    simulation = Simulation(**params, seed=seed_sequence)
+    simulation.run_simulation(num_days, analytics_schedule=analytics_schedule, stop_when_converged=stop_when_converged)
+
+    return get_daily_curves(simulation)
+
+
+def aggregate_ensemble_members(params, num_days, analytics_schedule, seed_sequences, curves, quantiles,
+                               stop_when_converged=True):
+    """
+    Runs some of the simulations of an ensemble one after the other, and returns an EnsembleStatistics of them (see
+    streaming_statistics.py). Arguments are the same as run_ensemble_member and aggregate_ensemble
+    """
+    ensemble_statistics = EnsembleStatistics(quantiles=quantiles)
+
+    for seed_sequence in seed_sequences:
+        simulation = Simulation(**params, seed=seed_sequence)
+        simulation.run_simulation(num_days, analytics_schedule=analytics_schedule,
+                                  stop_when_converged=stop_when_converged)
+
+        ensemble_statistics.add_run(get_final_day_statistics(simulation),
+                                    get_daily_curves(simulation) if curves else None)
+
+    return ensemble_statistics
+
+
+# Calls function with each set of arguments, in a pool of workers processes (or in this process for 1 worker)
+# Yields the results in the same order as the arguments, as they are ready
+def _map_in_processes(function, argument_lists, workers):
+    if workers == 1:
+        yield from map(function, *argument_lists)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, *argument_lists)
+
+
+def run_ensemble(params, n_runs, workers=None, num_days=28, analytics_schedule=None, seed=None,
+                 stop_when_converged=True):
+    """
+    Runs n_runs independent simulations with the same parameters, spread over a pool of processes
+
+    Returns a list with the final day statistics of each run (see get_final_day_statistics), in run order, so anything
+    computed from it doesn't depend on which runs finished first
+
+    params - dictionary of keyword arguments for each Simulation, e.g. {"num_people": 100, "max_friends": 25}
+    n_runs - the number of simulations to run
+    workers - the number of processes to run them in. Default: one per core. With 1, everything runs in this process
+    num_days - how many days each simulation runs for. Default: 28
+    analytics_schedule - which statistics to compute, see Simulation.run_simulation. Default: all of them, on the final
+                         day only
+    seed - seed for the whole ensemble. Each run gets its own stream spawned from it with np.random.SeedSequence
+    stop_when_converged - whether each run stops simulating once no more friendships can be made, its remaining days
+                          being filled in from the last one (see Simulation.run_simulation). Default: True
+
+    Analytics plugins (see simulation_analysis_funcs.register_analytics_plugin) have to be registered when the module
+    is imported to be seen by the worker processes on platforms that don't fork
+    """
+    if analytics_schedule is None:
+        analytics_schedule = FINAL_DAY_SCHEDULE
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_runs)
+
+    run_arguments = ([params] * n_runs, [num_days] * n_runs, [analytics_schedule] * n_runs, seed_sequences,
+                     [stop_when_converged] * n_runs)
+
+    return list(_map_in_processes(run_ensemble_member, run_arguments, workers))
+
+
+def aggregate_ensemble(params, n_runs, workers=None, num_days=28, analytics_schedule=None, seed=None, curves=False,
+                       quantiles=False, runs_per_task=8, stop_when_converged=True):
+    """
+    Runs n_runs independent simulations like run_ensemble, but instead of sending back each run's statistics, every
+    task of runs_per_task runs sends back one EnsembleStatistics (see streaming_statistics.py), and these are merged.
+    Memory doesn't grow with the number of runs
+
+    Returns the merged EnsembleStatistics. The runs are split into tasks and merged in the same order whatever the
+    number of workers, so the result is always the same for the same seed
+
+    curves - whether to also collect every statistic over every day, not just the final day. Default: False
+    quantiles - whether to keep quantile sketches of every statistic. Default: False
+    analytics_schedule - Default: every statistic on the final day, or on every day if curves is True
+
+    See run_ensemble for the rest of the arguments
+    """
+    if analytics_schedule is None:
+        analytics_schedule = DAILY_SCHEDULE if curves else FINAL_DAY_SCHEDULE
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_runs)
+    tasks = [seed_sequences[start:start + runs_per_task] for start in range(0, n_runs, runs_per_task)]
+
+    task_arguments = ([params] * len(tasks), [num_days] * len(tasks), [analytics_schedule] * len(tasks), tasks,
+                      [curves] * len(tasks), [quantiles] * len(tasks), [stop_when_converged] * len(tasks))
+    # Merged in task order as each task finishes
+    ensemble_statistics = EnsembleStatistics(quantiles=quantiles)
+    for statistics in _map_in_processes(aggregate_ensemble_members, task_arguments, workers):
+        ensemble_statistics.merge(statistics)
+
+    return ensemble_statistics
+
+
+def collect_ensemble_results(params, n_runs, workers=None, num_days=28, analytics_schedule=None, seed=None,
+                             stop_when_converged=True):
+    """
+    Runs n_runs independent simulations like run_ensemble, and returns every statistic of every run on every day as
+    one ResultsStore (see ResultsStore.py), which can be saved to a single file and loaded back in one call
+
+    analytics_schedule - Default: every statistic on every day
+
+    See run_ensemble for the rest of the arguments
+    """
+    if analytics_schedule is None:
+        analytics_schedule = DAILY_SCHEDULE
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_runs)
+    run_arguments = ([params] * n_runs, [num_days] * n_runs, [analytics_schedule] * n_runs, seed_sequences,
+                     [stop_when_converged] * n_runs)
+
+    analysis_dicts = simulation_analysis_funcs.get_empty_analysis_dicts()
+    results = ResultsStore(num_runs=n_runs, day_capacity=num_days)
+
+    for run, daily_curves in enumerate(_map_in_processes(run_ensemble_member_curves, run_arguments, workers)):
+        for dict_name, curves in daily_curves.items():
+            for key, curve in curves.items():
+                title, label = analysis_dicts[dict_name][key][1:3] if key in analysis_dicts[dict_name] else (key, key)
+                results.record_curve(dict_name, key, curve, run=run, title=title, label=label)
+
+    return results
@@ -0,0 +1,125 @@
+# Breadth-first search over the friendship graph in its compressed (CSR) form, see FriendshipGraph.to_csr()
+# Instead of searching from one person at a time, a batch of people is searched from together: the frontier of every
+#   search in the batch is one boolean matrix and each layer is expanded for the whole batch with a few array operations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def get_separation_totals(indptr, indices, sources, batch_size=64, workers=1):
+    """
+    Runs a breadth-first search from every person in sources
+
+    Parameters:
+        indptr, indices : the CSR adjacency, person i's friends are indices[indptr[i]:indptr[i + 1]]
+        sources : array of the people to search from
+        batch_size (int): how many searches are run together. Uses batch_size * num_people bytes per batch
+        workers (int): how many threads the batches are spread over. NumPy releases the GIL for the heavy work
+
+    Returns a tuple of two arrays, lined up with sources:
+        total_separation --> the sum of the degrees of separation from the source to everyone they can reach
+        eccentricity --> the degree of separation from the source to the farthest person they can reach
+    """
+
+    sources = np.asarray(sources, dtype=np.int64)
+    batches = [sources[start:start + batch_size] for start in range(0, len(sources), batch_size)]
+
+    def search_batch(batch):
+        return _search_from_batch(indptr, indices, batch)
+
+    if workers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            batch_results = list(executor.map(search_batch, batches))
+    else:
+        batch_results = [search_batch(batch) for batch in batches]
+
+    if not batch_results:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    total_separation = np.concatenate([result[0] for result in batch_results])
+    eccentricity = np.concatenate([result[1] for result in batch_results])
+
+    return total_separation, eccentricity
+
+
+def _search_from_batch(indptr, indices, batch):
+    num_people = len(indptr) - 1
+    num_searches = len(batch)
+    degree = np.diff(indptr)
+
+    total_separation = np.zeros(num_searches, dtype=np.int64)
+    eccentricity = np.zeros(num_searches, dtype=np.int64)
+
+    # visited[search][person] is whether that search has reached the person yet
+    visited = np.zeros((num_searches, num_people), dtype=bool)
+    visited[np.arange(num_searches), batch] = True
+
+    # The current layer of every search as (search, person) pairs
+    frontier_searches = np.arange(num_searches)
+    frontier_people = batch
+
+    layer_num = 0
+    while len(frontier_people) > 0:
+        layer_num += 1
+
+        # Every friend of every person in the frontier, keeping track of which search it belongs to
+        num_friends = degree[frontier_people]
+        friend_searches = np.repeat(frontier_searches, num_friends)
+        first_friend = np.repeat(indptr[frontier_people] - np.cumsum(num_friends) + num_friends, num_friends)
+        friend_people = indices[first_friend + np.arange(len(friend_searches))]
+
+        # The next layer is everyone reached who hasn't been visited yet
+        next_layer = np.zeros((num_searches, num_people), dtype=bool)
+        next_layer[friend_searches, friend_people] = True
+        next_layer &= ~visited
+        visited |= next_layer
+
+        frontier_searches, frontier_people = np.nonzero(next_layer)
+
+        layer_sizes = np.bincount(frontier_searches, minlength=num_searches)
+        total_separation += layer_sizes * layer_num
+        eccentricity[layer_sizes > 0] = layer_num
+
+    return total_separation, eccentricity
+
+
+def get_distances_from(indptr, indices, source):
+    """
+    Runs a single breadth-first search from source
+
+    Returns an array where entry i is the degree of separation from source to person i, or -1 if they can't be reached
+    """
+
+    num_people = len(indptr) - 1
+    degree = np.diff(indptr)
+
+    distances = np.full(num_people, -1, dtype=np.int64)
+    distances[source] = 0
+
+    frontier = np.array([source], dtype=np.int64)
+    layer_num = 0
+    while len(frontier) > 0:
+        layer_num += 1
+
+        # Every friend of every person in the frontier
+        num_friends = degree[frontier]
+        first_friend = np.repeat(indptr[frontier] - np.cumsum(num_friends) + num_friends, num_friends)
+        friends = indices[first_friend + np.arange(num_friends.sum())]
+
+        frontier = np.unique(friends[distances[friends] == -1])
+        distances[frontier] = layer_num
+
+    return distances
+
+
+def estimate_diameter(indptr, indices, start):
+    """
+    Double sweep lower bound on the largest degree of separation in start's friend group: search from start, then
+    search again from the person farthest from start. The farthest distance found in the second search is a lower
+    bound on the true value, and on friendship networks it is almost always exact.
+    """
+
+    farthest_from_start = np.argmax(get_distances_from(indptr, indices, start))
+
+    return int(get_distances_from(indptr, indices, farthest_from_start).max())
@@ -0,0 +1,197 @@
+import numpy as np
+
+# How many times a partner who can't make friends today is redrawn before the interaction is given up on
+MAX_REDRAWS = 16
+
+
+class CumulativeSampler:
+    """
+    Picks who each person interacts with, as person ids, using the running sums of the interaction weights.
+
+    At the start of each day (prepare_day) the running sums of the rows that changed are brought up to date, and
+    then a person's partners are found by drawing uniform numbers along their row and binary searching for them.
+    This is the same distribution as np.random.choice over the normalized row, but it never has to re-validate or
+    re-sum a length num_people probability vector for each person.
+
+    interaction_weights - the InteractionWeights of the simulation
+    rng - the numpy Generator to draw from
+    skip_inactive - whether partners who aren't in the day's ActiveSet are redrawn, see _skip_inactive. Default: False
+    """
+
+    def __init__(self, interaction_weights, rng, skip_inactive=False):
+        self.interaction_weights = interaction_weights
+        self.rng = rng
+        self.skip_inactive = skip_inactive
+        self.cumulative_weights = interaction_weights.cumulative_weights
+        self.active = None
+
+    # Fixes the interaction probabilities for the day, must be called before sample()
+    # active - the day's ActiveSet (see ActiveSet.py), kept up to date by the day engine as people drop out
+    def prepare_day(self, active=None):
+        self.cumulative_weights = self.interaction_weights.update_cumulative_weights()
+        self.active = active if self.skip_inactive else None
+
+    # Returns the ids of num_interactions people that person_idx interacts with (with replacement), -1 for any
+    #   interaction without an active partner
+    def sample(self, person_idx, num_interactions):
+        row = self.cumulative_weights[person_idx]
+
+        def draw(person_ids):
+            targets = _draw_targets(self.rng, np.full(len(person_ids), row[-1]))
+            return np.searchsorted(row, targets, side="right")
+
+        return _skip_inactive(draw, np.full(num_interactions, person_idx, dtype=np.int64), self.active)
+
+    # Returns one interaction partner for each person in person_ids, -1 for anyone without an active partner
+    def sample_batch(self, person_ids):
+        return _skip_inactive(self.__draw_batch, person_ids, self.active)
+
+    # Draws one interaction partner for each person in person_ids
+    # Every row gets its own binary search, done in lockstep for all of the rows at once
+    def __draw_batch(self, person_ids):
+        cumulative_weights = self.cumulative_weights
+        num_people = cumulative_weights.shape[1]
+        targets = _draw_targets(self.rng, cumulative_weights[person_ids, -1])
+
+        # Find the first column whose running sum is past the target
+        low = np.zeros(len(person_ids), dtype=np.int64)
+        high = np.full(len(person_ids), num_people, dtype=np.int64)
+        while np.any(low < high):
+            middle = np.minimum((low + high) // 2, num_people - 1)
+            go_right = cumulative_weights[person_ids, middle] <= targets
+            low = np.where(go_right & (low < high), middle + 1, low)
+            high = np.where(~go_right & (low < high), middle, high)
+
+        return low
+
+
+class MixtureSampler:
+    """
+    Picks who each person interacts with, as person ids, without ever building the interaction weight matrix.
+
+    The weight person_1 has for person_2 is 1 + direct_friend_weight (if friends) + fof_weight * (common friends), so
+    the total weight of a person's row splits into three parts:
+        strangers - everyone else, each with weight 1, for a total of num_people - 1
+        friends - each friend with weight direct_friend_weight
+        friends-of-friends - fof_weight for each path person --> friend --> someone other than the person
+    A partner is drawn by picking one of the parts by its total weight, then picking uniformly inside it: a random
+    person, a random friend, or a random path through a friend. This is exactly the same distribution as the
+    normalized weight matrix, but each draw only costs O(max_friends) and memory stays O(num_people + friendships).
+
+    Like the weight matrix, the probabilities are fixed at the start of the day. Each person's row of
+    friendship_graph.neighbors only ever grows at the end, so the first degree entries of each row (as of
+    prepare_day) are the friendships from before today.
+
+    friendship_graph - the FriendshipGraph of the simulation
+    direct_friend_weight - the bonus weight for interacting with a friend
+    fof_weight - the bonus weight for each common friend
+    rng - the numpy Generator to draw from
+    skip_inactive - whether partners who aren't in the day's ActiveSet are redrawn, see _skip_inactive. Default: False
+    """
+
+    def __init__(self, friendship_graph, direct_friend_weight, fof_weight, rng, skip_inactive=False):
+        self.friendship_graph = friendship_graph
+        self.direct_friend_weight = direct_friend_weight
+        self.fof_weight = fof_weight
+        self.rng = rng
+        self.skip_inactive = skip_inactive
+        self.active = None
+
+        # Everyone's number of friends at the start of the day
+        self.day_degree = friendship_graph.degree.copy()
+
+    # Fixes the interaction probabilities for the day, must be called before sample()
+    # active - the day's ActiveSet (see ActiveSet.py), kept up to date by the day engine as people drop out
+    def prepare_day(self, active=None):
+        self.day_degree = self.friendship_graph.degree.copy()
+        self.active = active if self.skip_inactive else None
+
+    # Returns the ids of num_interactions people that person_idx interacts with (with replacement), -1 for any
+    #   interaction without an active partner
+    def sample(self, person_idx, num_interactions):
+        return self.sample_batch(np.full(num_interactions, person_idx, dtype=np.int64))
+
+    # Returns one interaction partner for each person in person_ids, -1 for anyone without an active partner
+    def sample_batch(self, person_ids):
+        return _skip_inactive(self.__draw_batch, person_ids, self.active)
+
+    # Draws one interaction partner for each person in person_ids
+    def __draw_batch(self, person_ids):
+        num_people = self.friendship_graph.num_people
+        neighbors = self.friendship_graph.neighbors
+        day_degree = self.day_degree
+        rng = self.rng
+
+        num_friends = day_degree[person_ids]
+        friends = neighbors[person_ids]
+        is_friend_slot = np.arange(neighbors.shape[1]) < num_friends[:, None]
+
+        # Each friend leads to all of their friends except this person
+        paths_through_friend = np.where(is_friend_slot, day_degree[friends] - 1, 0)
+        cumulative_paths = np.cumsum(paths_through_friend, axis=1)
+        total_paths = cumulative_paths[:, -1]
+
+        stranger_weight = num_people - 1
+        friend_weight = self.direct_friend_weight * num_friends
+        fof_weight = self.fof_weight * total_paths
+
+        # Pick which part of the distribution each draw comes from
+        category_draws = rng.random(len(person_ids)) * (stranger_weight + friend_weight + fof_weight)
+        is_stranger = category_draws < stranger_weight
+        is_friend = ~is_stranger & (category_draws < stranger_weight + friend_weight)
+        is_fof = ~is_stranger & ~is_friend
+
+        partners = np.empty(len(person_ids), dtype=np.int64)
+
+        # A random person other than themselves
+        strangers = rng.integers(0, num_people - 1, size=is_stranger.sum())
+        strangers[strangers >= person_ids[is_stranger]] += 1
+        partners[is_stranger] = strangers
+
+        # A random friend
+        friend_slots = rng.integers(0, num_friends[is_friend])
+        partners[is_friend] = friends[is_friend, friend_slots]
+
+        # A random path through a friend: pick the friend by how many paths go through them, then one of their friends
+        if is_fof.any():
+            path_draws = _draw_targets(rng, total_paths[is_fof].astype(np.float64))
+            middle_slots = np.sum(cumulative_paths[is_fof] <= path_draws[:, None], axis=1)
+            middle_friends = friends[is_fof, middle_slots]
+
+            # Skip over this person in their friend's row
+            path_ends = rng.integers(0, day_degree[middle_friends] - 1)
+            own_slots = np.argmax(neighbors[middle_friends] == person_ids[is_fof, None], axis=1)
+            path_ends[path_ends >= own_slots] += 1
+
+            partners[is_fof] = neighbors[middle_friends, path_ends]
+
+        return partners
+
+
+# Draws partners with draw(person_ids), then redraws anyone whose partner isn't in the ActiveSet active (they are out
+#   of interactions or at their max friends, so meeting them can't lead to a friendship), up to MAX_REDRAWS times.
+#   This is the same as drawing from the weights of only the active people, except that when almost no one is active
+#   some draws give up and are -1
+# All of the redraws are drawn at once and the first active one is kept, so this is two draw calls however many
+#   people are inactive
+# With active None, returns the first draws
+def _skip_inactive(draw, person_ids, active):
+    partners = draw(person_ids)
+    if active is None:
+        return partners
+
+    inactive = np.flatnonzero(~active.contains_batch(partners))
+    if len(inactive) > 0:
+        redraws = draw(np.repeat(person_ids[inactive], MAX_REDRAWS)).reshape(len(inactive), MAX_REDRAWS)
+        is_active = active.contains_batch(redraws)
+
+        first_active = np.argmax(is_active, axis=1)
+        partners[inactive] = np.where(is_active.any(axis=1), redraws[np.arange(len(inactive)), first_active], -1)
+
+    return partners
+
+
+# Draws a uniform number in [0, total) for each row total
+# Rounding could put total * random() exactly on the total, which has no partner, so we stay just below it
+def _draw_targets(rng, row_totals):
+    return np.minimum(rng.random(len(row_totals)) * row_totals, np.nextafter(row_totals, 0))
@@ -1,43 +1,66 @@
 # Ben Williams '25 and Sam Starrs '26
 # May 10th, 2024
 
-import networkx as nx
-from Simulation import Simulation
+from AnalyticsSnapshot import AnalyticsSnapshot
+from Population import MIN_AGE, MAX_AGE, NUM_GENDERS, NUM_RACES
+import graph_distance_funcs
 import numpy as np
 import os
 import matplotlib.pyplot as plt
 
-
-def get_loners(simulation):
+# The analysis dictionaries of a simulation, see get_empty_analysis_dicts
+ANALYSIS_DICT_NAMES = ("connectedness_dict", "friend_group_dict", "loner_dict", "most_connected_dict",
+                       "least_connected_dict", "plugin_dict")
+
+# The attributes that are counted rather than averaged, with (smallest value, number of values)
+CATEGORICAL_ATTRIBUTES = {
+    "age": (MIN_AGE, MAX_AGE - MIN_AGE + 1),
+    "gender": (0, NUM_GENDERS),
+    "race": (0, NUM_RACES),
+}
+
+# The loner statistics for each preference, and the Population array they average
+LONER_PREFERENCE_STATISTICS = {
+    "avg_same_race_pref": "same_race_pref",
+    "avg_other_race_pref": "other_race_pref",
+    "avg_same_gender_pref": "same_gender_pref",
+    "avg_other_gender_pref": "opposite_gender_pref",
+    "avg_same_age_pref": "same_age_pref",
+    "avg_age_diff_pref": "age_diff_pref",
+    "avg_same_hobby_pref": "same_hobby_pref",
+}
+
+
+def get_loners(simulation, snapshot=None):
     """
     Returns a list of Person objects of the people in the simulation without friends
-    """
-    loners = []
 
-    for person in simulation.people:
-        if len(person.friends) == 0:
-            loners.append(person)
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
+    """
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
 
-    return loners
+    return [snapshot.person(person_id) for person_id in snapshot.loner_ids]
 
 
-def get_non_loners(simulation):
+def get_non_loners(simulation, snapshot=None):
     """
     Returns a list of Person objects of the people in the simulation with friends
-    """
-    social_people = []
 
-    for person in simulation.people:
-        if len(person.friends) > 0:
-            social_people.append(person)
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
+    """
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
 
-    return social_people
+    return [snapshot.person(person_id) for person_id in snapshot.non_loner_ids]
 
 
-def get_loner_statistics(simulation):
+def get_loner_statistics(simulation, snapshot=None):
     """
     Gets the statistics for everyone who has no friends at the current point in the simulation.
 
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
+
     Returns a dictionary with the following keys (string):
 
      total_loners --> the number of people who are left alone
@@ -64,64 +87,166 @@ def get_loner_statistics(simulation):
 
     """
 
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
+
+    population = simulation.population
+
+    # Group 1 is the loners, group 0 is everyone else
+    labels = snapshot.loner_mask.view(np.int8)
+
     results = dict()
 
-    loners = get_loners(simulation)
-
-    age_distribution = np.zeros(50 - 18 + 1) # ages range from 18 --> 52
-    race_distribution = np.zeros(6)
-    friend_threshold_total = 0
-    same_race_pref_total = 0
-    other_race_pref_total = 0
-    same_gender_pref_total = 0
-    other_gender_pref_total = 0
-    same_age_pref_total = 0
-    other_age_pref_total = 0
-    hobby_pref_total = 0
-
-    for person in loners:
-        age_distribution[person.characteristics["age"] - 18] += 1
-        race_distribution[person.characteristics["race"]] += 1
-        friend_threshold_total += person.friend_threshold
-        same_race_pref_total += person.preferences["same_race"]
-        other_race_pref_total += person.preferences["other_race"]
-        same_gender_pref_total += person.preferences["same_gender"]
-        other_gender_pref_total += person.preferences["opposite_gender"]
-        same_age_pref_total += person.preferences["same_age"]
-        other_age_pref_total += person.preferences["age_year_diff"]
-        hobby_pref_total += person.preferences["same_hobby"]
-
-    total_loners = len(loners)
+    total_loners = int(np.count_nonzero(snapshot.loner_mask))
+    results["total_loners"] = total_loners
 
     if total_loners == 0:
-        results["total_loners"] = 0
-        results["age_distribution"] = age_distribution
-        results["race_distribution"] = race_distribution
+        results["age_distribution"] = np.zeros(MAX_AGE - MIN_AGE + 1)
+        results["race_distribution"] = np.zeros(NUM_RACES)
+        for key in LONER_PREFERENCE_STATISTICS:
+            results[key] = None
         results["avg_friend_threshold"] = None
-        results["avg_same_race_pref"] = None
-        results["avg_other_race_pref"] = None
-        results["avg_same_gender_pref"] = None
-        results["avg_other_gender_pref"] = None
-        results["avg_same_age_pref"] = None
-        results["avg_age_diff_pref"] = None
-        results["avg_same_hobby_pref"] = None
+
+        return results
+
+    results["age_distribution"] = get_group_distributions(population.age - MIN_AGE, labels, 2,
+                                                          MAX_AGE - MIN_AGE + 1)[1] / total_loners
+    results["race_distribution"] = get_group_distributions(population.race, labels, 2, NUM_RACES)[1] / total_loners
+    results["avg_friend_threshold"] = float("{:.3f}".format(get_group_means(population.friend_threshold, labels, 2)[1]))
+
+    # The preferences are averaged as they are printed for each person, to three decimal places
+    for key, attribute in LONER_PREFERENCE_STATISTICS.items():
+        rounded_preference = np.round(getattr(population, attribute), 3)
+        results[key] = float("{:.3f}".format(get_group_means(rounded_preference, labels, 2)[1]))
+
+    return results
+
+
+def get_group_means(values, labels, num_groups):
+    """
+    Returns the mean of values within each group, where person i is in group labels[i]. Groups with nobody in them
+    get a mean of nan
+
+    values - an array with one value per person
+    labels - an array of integers in [0, num_groups) with the group of each person
+    num_groups - how many groups there are
+    """
+    counts = np.bincount(labels, minlength=num_groups)
+    totals = np.bincount(labels, weights=values, minlength=num_groups)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return totals / counts
+
+
+def get_group_distributions(values, labels, num_groups, num_values):
+    """
+    Returns a (num_groups x num_values) array where entry [group][value] is how many people in the group have that value
+
+    values - an array of integers in [0, num_values) with one value per person
+    labels - an array of integers in [0, num_groups) with the group of each person
+    """
+    combined = labels.astype(np.int64) * num_values + values
+    return np.bincount(combined, minlength=num_groups * num_values).reshape(num_groups, num_values)
+
+
+def get_group_labels(simulation, group_by, snapshot=None, degree_buckets=(1, 2, 5, 10)):
+    """
+    Splits everyone into groups to break statistics down by. Returns (labels, num_groups) where labels[i] is the group
+    of person i, for get_group_means, get_group_distributions and get_attribute_breakdown
+
+    group_by - how to split people up:
+        "loners" --> group 1 is people without friends, group 0 is everyone else
+        "largest_group" --> group 1 is people in the largest friend group, group 0 is everyone else
+        "degree" --> grouped by their number of friends, using degree_buckets
+        an array --> the group of each person, integers starting at 0
+
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
+
+    degree_buckets - for "degree", the number of friends each group starts at. With the default, group 0 has no friends,
+                     group 1 has one friend, group 2 has 2-4, group 3 has 5-9 and group 4 has 10 or more
+    """
+    if isinstance(group_by, str) and snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
+
+    if isinstance(group_by, str) and group_by == "loners":
+        return snapshot.loner_mask.view(np.int8), 2
+    elif isinstance(group_by, str) and group_by == "largest_group":
+        labels = np.zeros(simulation.num_people, dtype=np.int8)
+        labels[snapshot.largest_group] = 1
+        return labels, 2
+    elif isinstance(group_by, str) and group_by == "degree":
+        return np.searchsorted(degree_buckets, snapshot.degree, side="right"), len(degree_buckets) + 1
+    elif isinstance(group_by, str):
+        raise ValueError(f"Unknown grouping: {group_by}")
+
+    labels = np.asarray(group_by)
+    return labels, int(labels.max()) + 1
+
+
+def get_attribute_breakdown(simulation, attribute, group_by, snapshot=None, **group_options):
+    """
+    Breaks any population attribute down by any grouping of people
+
+    Returns a dictionary with the following keys:
+
+     counts --> the number of people in each group
+
+     values --> for age, gender and race a (num_groups x num_values) array with how many people in each group have
+                each value (ages start at 18). For anything else, the mean of the attribute in each group (nan if empty)
+
+    attribute - the name of a Population array (see Population.py), or "num_friends"
+    group_by - see get_group_labels, any extra keyword arguments are passed on to it
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
+    """
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
+
+    labels, num_groups = get_group_labels(simulation, group_by, snapshot, **group_options)
+
+    if attribute == "num_friends":
+        values = snapshot.degree
     else:
-        results["total_loners"] = total_loners
-        results["age_distribution"] = age_distribution / total_loners
-        results["race_distribution"] = race_distribution / total_loners
-        results["avg_friend_threshold"] = float("{:.3f}".format(friend_threshold_total / total_loners))
-        results["avg_same_race_pref"] = float("{:.3f}".format(same_race_pref_total / total_loners))
-        results["avg_other_race_pref"] = float("{:.3f}".format(other_race_pref_total / total_loners))
-        results["avg_same_gender_pref"] = float("{:.3f}".format(same_gender_pref_total / total_loners))
-        results["avg_other_gender_pref"] = float("{:.3f}".format(other_gender_pref_total / total_loners))
-        results["avg_same_age_pref"] = float("{:.3f}".format(same_age_pref_total / total_loners))
-        results["avg_age_diff_pref"] = float("{:.3f}".format(other_age_pref_total / total_loners))
-        results["avg_same_hobby_pref"] = float("{:.3f}".format(hobby_pref_total / total_loners))
+        values = getattr(simulation.population, attribute)
+
+    results = dict()
+    results["counts"] = np.bincount(labels, minlength=num_groups)
+
+    if attribute in CATEGORICAL_ATTRIBUTES:
+        smallest_value, num_values = CATEGORICAL_ATTRIBUTES[attribute]
+        results["values"] = get_group_distributions(values.astype(np.int64) - smallest_value, labels, num_groups,
+                                                    num_values)
+    else:
+        results["values"] = get_group_means(values, labels, num_groups)
 
     return results
 
 
-def get_friend_group_info(simulation):
+# Extra metrics registered with register_analytics_plugin, by name
+analytics_plugins = dict()
+
+
+def register_analytics_plugin(name, metric, title, label):
+    """
+    Adds a metric that is computed every analytics day alongside the built-in ones. Its values are kept in the
+    simulation's plugin_dict under name, and are plotted and printed like every other statistic
+
+    name - the key the metric's values are stored under
+    metric - a function taking the day's AnalyticsSnapshot and returning the value for that day. Anything it derives
+             from the friendships can be shared with other metrics through snapshot.get_cached
+    title - the title of the metric, used for plots and the printed analysis
+    label - the label for the metric's values, used for plots
+    """
+    analytics_plugins[name] = (metric, title, label)
+
+
+def get_plugin_info(snapshot):
+    """
+    Returns a dictionary with the value of every registered plugin metric (see register_analytics_plugin) for the day
+    """
+    return {name: metric(snapshot) for name, (metric, title, label) in analytics_plugins.items()}
+
+
+def get_friend_group_info(simulation, snapshot=None):
     """
     Returns a dictionary containing information about the connected components on the graph with >1 node/person
 
@@ -133,33 +258,23 @@ def get_friend_group_info(simulation):
 
      total_friendships --> the total number of friendships in the whole simulation
 
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
     """
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
 
-    # Create networkx graph
-    friendship_graph = nx.Graph()
-    friendship_graph.add_edges_from(simulation.friendships)
-
+    # The simulation keeps its friend groups up to date as friendships are made (see FriendGroups.py),
+    #   so there is no graph to build here
     results = dict()
 
-    results["num_fgs"] = nx.number_connected_components(friendship_graph)
-    results["total_friendships"] = len(simulation.friendships)
-
-    # friend_groups is a generator of sets of friend groups, may be useful later
-    friend_groups = nx.connected_components(friendship_graph)
-    friend_total = 0
-    for friend_group in friend_groups:
-        friend_total += len(friend_group)
-
-    # Ensure no divide by 0
-    if results["num_fgs"] > 0:
-        results["avg_fg_size"] = friend_total / results["num_fgs"]
-    else:
-        results["avg_fg_size"] = 0
+    results["num_fgs"] = snapshot.num_friend_groups
+    results["total_friendships"] = snapshot.num_friendships
+    results["avg_fg_size"] = snapshot.avg_friend_group_size
 
     return results
 
 
-def get_connectedness_info(simulation):
+def get_connectedness_info(simulation, snapshot=None, workers=1, verify=False, modes=None, num_samples=256, rng=None):
     """
     Gets information on the connectedness of people in the **largest connected component** (friend group)
 
@@ -169,6 +284,8 @@ def get_connectedness_info(simulation):
 
      avg_avg_deg_sep --> the average over all people of the average degree of separation each person is from everyone else
 
+     avg_avg_deg_sep_ci --> half the width of the 95% confidence interval of avg_avg_deg_sep (0 when it is exact)
+
      max_avg_deg_sep --> the maximum distance avg degree of separation for a person from everyone else
 
      max_avg_deg_sep_person --> the person object for the max_avg_deg_of_sep
@@ -182,68 +299,117 @@ def get_connectedness_info(simulation):
 
      max_distance --> the farthest away two people are from each other
 
+     modes --> which mode ("exact" or "approximate") produced avg_avg_deg_sep and max_distance
+
+    snapshot - the AnalyticsSnapshot for today, one is made if it isn't given (see AnalyticsSnapshot.py)
+
+    workers - how many threads the breadth-first searches are spread over (see graph_distance_funcs.py)
+
+    verify - if the simulation tracks separations as friendships are made, also do the full breadth-first searches and
+             raise a RuntimeError if they don't match
+
+    modes - dictionary of "exact" or "approximate" for "avg_avg_deg_sep" and "max_distance". Default: both exact
+        avg_avg_deg_sep approximate --> only search from num_samples random people in the group. The min/max average
+                                        degree of separation (and their people) then come from those people too
+        max_distance approximate --> a double sweep lower bound (see graph_distance_funcs.estimate_diameter), raised to
+                                     the farthest distance seen by any sampled search. Only used when avg_avg_deg_sep
+                                     is approximate too, otherwise everyone is searched from anyway and max_distance is
+                                     exact for free
+
+    num_samples - how many people to search from for the approximate avg_avg_deg_sep
+
+    rng - the numpy Generator the approximations draw from. Default: a freshly seeded one
+
+    If several people tie for the min/max average degree of separation, the one with the smallest id is used
     """
 
-    # Create networkx graph
-    friendship_graph = nx.Graph()
-    friendship_graph.add_edges_from(simulation.friendships)
+    if snapshot is None:
+        snapshot = AnalyticsSnapshot(simulation)
+    if rng is None:
+        rng = np.random.default_rng()
 
-    # Get the largest connected component
-    largest_fg_set = max(nx.connected_components(friendship_graph), key=len)
+    used_modes = {"avg_avg_deg_sep": "exact", "max_distance": "exact"}
+    if modes is not None:
+        for key, mode in modes.items():
+            if key not in used_modes:
+                raise ValueError(f"Unknown connectedness metric: {key}")
+            if mode not in ("exact", "approximate"):
+                raise ValueError(f"Unknown mode for {key}: {mode}")
+        used_modes.update(modes)
 
-    # Get the subgraph of just this group
-    largest_fg_graph = friendship_graph.subgraph(largest_fg_set).copy()
+    # Get the largest connected component
+    largest_fg = snapshot.largest_group
 
-    total_friends = 0
-    total_avg_degree_sep = 0
-    max_avg_deg = 0
-    min_avg_deg = np.inf
-    min_avg_deg_person = None
-    max_avg_deg_person = None
-    max_distance = 0
+    separation_tracker = snapshot.separation_tracker
+    indptr, indices = snapshot.csr
 
-    # The slow part - looping through a bfs on each person
-    for person_id in largest_fg_set:
-        # Get the number of friends for the person and add it to the total
-        total_friends += len(simulation.people[person_id].friends)
+    # Approximating is only worth it when there are more people than samples, and when separations aren't tracked
+    if separation_tracker is not None or len(largest_fg) <= num_samples:
+        used_modes = {key: "exact" for key in used_modes}
 
-        # Get all the layers
-        total_separation = 0
-        bfs_layers = nx.bfs_layers(largest_fg_graph, person_id)
+    # An exact avg_avg_deg_sep searches from everyone, which gives the exact max_distance too
+    if used_modes["avg_avg_deg_sep"] == "exact":
+        used_modes["max_distance"] = "exact"
 
-        # Go through each layer and add to the total
-        layer_num = 0
-        for layer in bfs_layers:
-            total_separation += len(layer) * layer_num
+    # Only the sampled people need to be searched from, unless max_distance needs everyone
+    searched_people = largest_fg
+    if used_modes["avg_avg_deg_sep"] == "approximate":
+        sampled_people = np.sort(rng.choice(largest_fg, size=num_samples, replace=False))
+        if used_modes["max_distance"] == "approximate":
+            searched_people = sampled_people
 
-            # See if this person has people very far away from them
-            if layer_num > max_distance:
-                max_distance = layer_num
+    if separation_tracker is None or verify:
+        # The slow part - a breadth-first search from each person, done in batches over the compressed graph
+        total_separation, eccentricity = graph_distance_funcs.get_separation_totals(indptr, indices, searched_people,
+                                                                                    workers=workers)
 
-            layer_num += 1
+    if separation_tracker is not None:
+        if verify:
+            separation_tracker.verify(largest_fg, total_separation, eccentricity)
 
-        # We don't include the person we are considering now
-        individual_avg_separation = total_separation / (len(largest_fg_set) - 1)
-        total_avg_degree_sep += individual_avg_separation
+        # The simulation has kept everyone's separations up to date, see SeparationTracker.py
+        total_separation = separation_tracker.total_separation[largest_fg]
+        eccentricity = separation_tracker.get_eccentricity(largest_fg)
 
-        # See if this is the largest separation
-        if individual_avg_separation > max_avg_deg:
-            max_avg_deg = individual_avg_separation
-            max_avg_deg_person = simulation.people[person_id]
+    total_friends = snapshot.degree[largest_fg].sum()
 
-        # See if this is the minimum separation
-        if individual_avg_separation < min_avg_deg:
-            min_avg_deg = individual_avg_separation
-            min_avg_deg_person = simulation.people[person_id]
+    # We don't include the person we are considering now
+    individual_avg_separation = total_separation / (len(largest_fg) - 1)
 
     results = dict()
-    results["avg_friends"] = float("{:.3f}".format(total_friends / len(largest_fg_set)))
-    results["avg_avg_deg_sep"] = float("{:.3f}".format(total_avg_degree_sep / len(largest_fg_set)))
-    results["min_avg_deg_sep"] = float("{:.3f}".format(min_avg_deg))
+
+    if used_modes["avg_avg_deg_sep"] == "exact":
+        # Summed in order one at a time, so the average comes out exactly as if we had looped over each person
+        results["avg_avg_deg_sep"] = float("{:.3f}".format(sum(individual_avg_separation.tolist()) / len(largest_fg)))
+        results["avg_avg_deg_sep_ci"] = 0
+    else:
+        # Only use the sampled people, everyone may have been searched if max_distance is exact
+        is_sampled = np.isin(searched_people, sampled_people)
+        individual_avg_separation = individual_avg_separation[is_sampled]
+        searched_people = searched_people[is_sampled]
+
+        # Normal approximation, with the finite population correction since we sample without replacement
+        finite_population_correction = np.sqrt((len(largest_fg) - num_samples) / (len(largest_fg) - 1))
+        standard_error = individual_avg_separation.std(ddof=1) / np.sqrt(num_samples) * finite_population_correction
+
+        results["avg_avg_deg_sep"] = float("{:.3f}".format(individual_avg_separation.mean()))
+        results["avg_avg_deg_sep_ci"] = float("{:.3f}".format(1.96 * standard_error))
+
+    if used_modes["max_distance"] == "exact":
+        results["max_distance"] = int(eccentricity.max())
+    else:
+        double_sweep = graph_distance_funcs.estimate_diameter(indptr, indices, rng.choice(largest_fg))
+        results["max_distance"] = max(double_sweep, int(eccentricity.max()))
+
+    min_avg_deg_person = snapshot.person(searched_people[np.argmin(individual_avg_separation)])
+    max_avg_deg_person = snapshot.person(searched_people[np.argmax(individual_avg_separation)])
+
+    results["avg_friends"] = float("{:.3f}".format(total_friends / len(largest_fg)))
+    results["min_avg_deg_sep"] = float("{:.3f}".format(individual_avg_separation.min()))
     results["min_avg_deg_sep_person"] = min_avg_deg_person
-    results["max_avg_deg_sep"] = float("{:.3f}".format(max_avg_deg))
+    results["max_avg_deg_sep"] = float("{:.3f}".format(individual_avg_separation.max()))
     results["max_avg_deg_sep_person"] = max_avg_deg_person
-    results["max_distance"] = max_distance
+    results["modes"] = used_modes
 
     return results
 
@@ -309,62 +475,69 @@ def get_empty_analysis_dicts():
         least_connected_dict --> to fetch information from the least connected person -
                                     get this from the get_connectedness_info function
 
+        plugin_dict --> based off of the registered plugin metrics, see register_analytics_plugin
+
+    Each statistic is stored as (values, title, label, days) where values[k] is the statistic on day days[k]
+    (days start at 1)
+
     """
     connectedness_dict = {
-        "new_friendships_made": ([], "New Friendships Made", "Number of New Friendships"),
-        "avg_friends": ([], "Average Friends", "Number of Friends"),
-        "avg_avg_deg_sep": ([], "Average Average Degree of Separation", "Degree of Separation"),
-        "max_avg_deg_sep": ([], "Maximum Average Degree of Separation", "Degree of Separation"),
-        "min_avg_deg_sep": ([], "Minimum Average Degree of Separation", "Degree of Separation"),
+        "new_friendships_made": ([], "New Friendships Made", "Number of New Friendships", []),
+        "avg_friends": ([], "Average Friends", "Number of Friends", []),
+        "avg_avg_deg_sep": ([], "Average Average Degree of Separation", "Degree of Separation", []),
+        "avg_avg_deg_sep_ci": ([], "Average Average Degree of Separation 95% Confidence Interval (+/-)",
+                               "Degree of Separation", []),
+        "max_avg_deg_sep": ([], "Maximum Average Degree of Separation", "Degree of Separation", []),
+        "min_avg_deg_sep": ([], "Minimum Average Degree of Separation", "Degree of Separation", []),
         # "min_avg_deg_sep_person": ([], "Person with Minimum Average Degree of Separation"),
-        "max_distance": ([], "Maximum Distance between Two People", "Distance")
+        "max_distance": ([], "Maximum Distance between Two People", "Distance", [])
     }
 
     friend_group_dict = {
-        "num_fgs": ([], "Number of Disconnected Friend Groups", "Number of Friend Groups"),
-        "avg_fg_size": ([], "Average Size of Each Friend Group", "Size of Friend Group"),
-        "total_friendships": ([], "Total Number of Friendships", "Number of Friendships")
+        "num_fgs": ([], "Number of Disconnected Friend Groups", "Number of Friend Groups", []),
+        "avg_fg_size": ([], "Average Size of Each Friend Group", "Size of Friend Group", []),
+        "total_friendships": ([], "Total Number of Friendships", "Number of Friendships", [])
 
     }
 
     loner_dict = {
-        "total_loners": ([], "Total Loners", "Number of People"),
-        "avg_friend_threshold": ([], "Average Friend Threshold", "Friend Threshold"),
-        "age_distribution": ([], "Age Distribution", "Age"),
-        "race_distribution": ([], "Race Distribution", "Amount per Race"),
-        "avg_same_race_pref": ([], "Average Same Race Preference", "Same Race Preference"),
-        "avg_other_race_pref": ([], "Average Other Race Preference", "Other Race Preference"),
-        "avg_same_gender_pref": ([], "Average Same Gender Preference", "Same Gender Preference"),
-        "avg_other_gender_pref": ([], "Average Other Gender Preference", "Other Gender Preference"),
-        "avg_same_age_pref": ([], "Average Same Age Preference", "Same Age Preference"),
-        "avg_age_diff_pref": ([], "Average Age Difference Preference", "Age Difference Preference"),
-        "avg_same_hobby_pref": ([], "Average Same Hobby Preference", "Same Hobby Preference")
+        "total_loners": ([], "Total Loners", "Number of People", []),
+        "avg_friend_threshold": ([], "Average Friend Threshold", "Friend Threshold", []),
+        "age_distribution": ([], "Age Distribution", "Age", []),
+        "race_distribution": ([], "Race Distribution", "Amount per Race", []),
+        "avg_same_race_pref": ([], "Average Same Race Preference", "Same Race Preference", []),
+        "avg_other_race_pref": ([], "Average Other Race Preference", "Other Race Preference", []),
+        "avg_same_gender_pref": ([], "Average Same Gender Preference", "Same Gender Preference", []),
+        "avg_other_gender_pref": ([], "Average Other Gender Preference", "Other Gender Preference", []),
+        "avg_same_age_pref": ([], "Average Same Age Preference", "Same Age Preference", []),
+        "avg_age_diff_pref": ([], "Average Age Difference Preference", "Age Difference Preference", []),
+        "avg_same_hobby_pref": ([], "Average Same Hobby Preference", "Same Hobby Preference", [])
     }
 
     most_connected_dict = {
-        "age": ([], "Age of Most Connected Person", "Age"),
-        "friend_threshold": ([], "Friend Threshold of Most Connected Person", "Common Hobby Preference"),
-        "num_friends": ([], "Number of Friends of Most Connected Person", "Common Hobby Preference"),
-        "same_race_pref": ([], "Same Race Preference of Most Connected Person", "Same Race Preference"),
-        "other_race_pref": ([], "Other Race Preference of Most Connected Person", "Other Race Preference"),
-        "same_gender_pref": ([], "Same Gender Preference of Most Connected Person", "Same Race Preference"),
-        "opposite_gender_pref": ([], "Opposite Gender Penalty of Most Connected Person", "Opposite Gender Penalty"),
-        "same_age_pref": ([], "Same Age Preference of Most Connected Person", "Same Age Preference"),
-        "age_diff_pref": ([], "Age Difference (per year) Penalty of Most Connected Person", "Age Difference Penalty"),
-        "same_hobby_pref": ([], "Common Hobby Preference of Most Connected Person", "Common Hobby Preference"),
+        "age": ([], "Age of Most Connected Person", "Age", []),
+        "friend_threshold": ([], "Friend Threshold of Most Connected Person", "Common Hobby Preference", []),
+        "num_friends": ([], "Number of Friends of Most Connected Person", "Common Hobby Preference", []),
+        "same_race_pref": ([], "Same Race Preference of Most Connected Person", "Same Race Preference", []),
+        "other_race_pref": ([], "Other Race Preference of Most Connected Person", "Other Race Preference", []),
+        "same_gender_pref": ([], "Same Gender Preference of Most Connected Person", "Same Race Preference", []),
+        "opposite_gender_pref": ([], "Opposite Gender Penalty of Most Connected Person", "Opposite Gender Penalty", []),
+        "same_age_pref": ([], "Same Age Preference of Most Connected Person", "Same Age Preference", []),
+        "age_diff_pref": ([], "Age Difference (per year) Penalty of Most Connected Person", "Age Difference Penalty", []),
+        "same_hobby_pref": ([], "Common Hobby Preference of Most Connected Person", "Common Hobby Preference", []),
     }
 
     least_connected_dict = {
-        "age": ([], "Age of Least Connected Person", "Age"),
-        "friend_threshold": ([], "Friend Threshold of Least Connected Person", "Common Hobby Preference"),
-        "num_friends": ([], "Number of Friends of Least Connected Person", "Common Hobby Preference"),
-        "same_race_pref": ([], "Same Race Preference of Least Connected Person", "Same Race Preference"),
-        "other_race_pref": ([], "Other Race Preference of Least Connected Person", "Other Race Preference"),
-        "same_gender_pref": ([], "Same Gender Preference of Least Connected Person", "Same Race Preference"),
-        "opposite_gender_pref": ([], "Opposite Gender Preference of Least Connected Person", "Opposite Gender Preference"),
-        "same_age_pref": ([], "Same Age Preference of Least Connected Person", "Same Age Preference"),
-        "age_diff_pref": ([], "Age Difference (per year) Penalty of Least Connected Person", "Age Difference Penalty"),
-        "same_hobby_pref": ([], "Common Hobby Preference of Least Connected Person", "Common Hobby Preference"),
+        "age": ([], "Age of Least Connected Person", "Age", []),
+        "friend_threshold": ([], "Friend Threshold of Least Connected Person", "Common Hobby Preference", []),
+        "num_friends": ([], "Number of Friends of Least Connected Person", "Common Hobby Preference", []),
+        "same_race_pref": ([], "Same Race Preference of Least Connected Person", "Same Race Preference", []),
+        "other_race_pref": ([], "Other Race Preference of Least Connected Person", "Other Race Preference", []),
+        "same_gender_pref": ([], "Same Gender Preference of Least Connected Person", "Same Race Preference", []),
+        "opposite_gender_pref": ([], "Opposite Gender Preference of Least Connected Person", "Opposite Gender Preference", []),
+        "same_age_pref": ([], "Same Age Preference of Least Connected Person", "Same Age Preference", []),
+        "age_diff_pref": ([], "Age Difference (per year) Penalty of Least Connected Person", "Age Difference Penalty", []),
+        "same_hobby_pref": ([], "Common Hobby Preference of Least Connected Person", "Common Hobby Preference", []),
     }
 
     analysis_dicts = {
@@ -373,6 +546,7 @@ def get_empty_analysis_dicts():
         "loner_dict": loner_dict,
         "most_connected_dict": most_connected_dict,
         "least_connected_dict": least_connected_dict,
+        "plugin_dict": {name: ([], title, label, []) for name, (metric, title, label) in analytics_plugins.items()},
     }
 
     return analysis_dicts
@@ -392,6 +566,7 @@ def get_analytics(simulation, output_dir="analytics"):
     loner_dict = simulation.loner_dict
     most_connected_dict = simulation.most_connected_dict
     least_connected_dict = simulation.least_connected_dict
+    plugin_dict = simulation.plugin_dict
 
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
@@ -400,13 +575,13 @@ def get_analytics(simulation, output_dir="analytics"):
     os.makedirs(output_dir + "/loners", exist_ok=True)
     os.makedirs(output_dir + "/most_connected_person", exist_ok=True)
     os.makedirs(output_dir + "/least_connected_person", exist_ok=True)
+    os.makedirs(output_dir + "/plugins", exist_ok=True)
 
-
-    time_steps = list(range(1, len(connectedness_dict["avg_friends"][0]) + 1))
-
+    # Each statistic is plotted against the days it was computed on, which can differ between statistics (see
+    #   Simulation.run_simulation's analytics_schedule)
     for key, value in connectedness_dict.items():
         plt.figure(figsize=(10, 5))
-        plt.plot(time_steps, connectedness_dict[key][0], marker='o', color='b', label=connectedness_dict[key][2])
+        plt.plot(connectedness_dict[key][3], connectedness_dict[key][0], marker='o', color='b', label=connectedness_dict[key][2])
         plt.xlabel('Time Steps')
         plt.ylabel(connectedness_dict[key][1])
         plt.title(connectedness_dict[key][1] + " Over Time")
@@ -416,7 +591,7 @@ def get_analytics(simulation, output_dir="analytics"):
 
     for key, value in friend_group_dict.items():
         plt.figure(figsize=(10, 5))
-        plt.plot(time_steps, friend_group_dict[key][0], marker='o', color='b', label=friend_group_dict[key][2])
+        plt.plot(friend_group_dict[key][3], friend_group_dict[key][0], marker='o', color='b', label=friend_group_dict[key][2])
         plt.xlabel('Time Steps')
         plt.ylabel(friend_group_dict[key][1])
         plt.title(friend_group_dict[key][1] + " Over Time")
@@ -426,7 +601,7 @@ def get_analytics(simulation, output_dir="analytics"):
 
     for key, value in loner_dict.items():
         plt.figure(figsize=(10, 5))
-        plt.plot(time_steps, loner_dict[key][0], marker='o', color='b', label=loner_dict[key][2])
+        plt.plot(loner_dict[key][3], loner_dict[key][0], marker='o', color='b', label=loner_dict[key][2])
         plt.xlabel('Time Steps')
         plt.ylabel(loner_dict[key][1])
         plt.title(loner_dict[key][1] + " Over Time")
@@ -436,7 +611,7 @@ def get_analytics(simulation, output_dir="analytics"):
 
     for key, value in most_connected_dict.items():
         plt.figure(figsize=(10, 5))
-        plt.plot(time_steps, most_connected_dict[key][0], marker='o', color='b', label=most_connected_dict[key][2])
+        plt.plot(most_connected_dict[key][3], most_connected_dict[key][0], marker='o', color='b', label=most_connected_dict[key][2])
         plt.xlabel('Time Steps')
         plt.ylabel(most_connected_dict[key][1])
         plt.title(most_connected_dict[key][1] + " Over Time")
@@ -446,7 +621,7 @@ def get_analytics(simulation, output_dir="analytics"):
 
     for key, value in least_connected_dict.items():
         plt.figure(figsize=(10, 5))
-        plt.plot(time_steps, least_connected_dict[key][0], marker='o', color='b', label=least_connected_dict[key][2])
+        plt.plot(least_connected_dict[key][3], least_connected_dict[key][0], marker='o', color='b', label=least_connected_dict[key][2])
         plt.xlabel('Time Steps')
         plt.ylabel(least_connected_dict[key][1])
         plt.title(least_connected_dict[key][1] + " Over Time")
@@ -454,10 +629,23 @@ def get_analytics(simulation, output_dir="analytics"):
         plt.grid(True)
         plt.savefig(os.path.join(output_dir + "/least_connected_person", f'{key}.png'))
 
+    for key, value in plugin_dict.items():
+        plt.figure(figsize=(10, 5))
+        plt.plot(plugin_dict[key][3], plugin_dict[key][0], marker='o', color='b', label=plugin_dict[key][2])
+        plt.xlabel('Time Steps')
+        plt.ylabel(plugin_dict[key][1])
+        plt.title(plugin_dict[key][1] + " Over Time")
+        plt.legend()
+        plt.grid(True)
+        plt.savefig(os.path.join(output_dir + "/plugins", f'{key}.png'))
+
     simulation.print_analysis()
 
 
 if __name__ == "__main__":
+    # Imported here since Simulation.py imports this file
+    from Simulation import Simulation
+
     sim = Simulation(num_people=100, max_friends=50)
     sim.run_simulation(num_days=20)
 
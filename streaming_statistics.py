@@ -0,0 +1,225 @@
+import copy
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    A mergeable sketch of the distribution of values added to it (a KLL sketch), for estimating quantiles without
+    keeping every value. Works elementwise on arrays of a fixed shape, so one sketch covers a whole per-day curve.
+
+    Values are kept in levels, where each value on level h stands for 2^h of the original values. When a level fills
+    up it is sorted and every other value moves up a level, so memory stays around 3k values per element no matter
+    how many are added. Quantiles are within about 1/k (in rank) of the true ones.
+
+    shape - the shape of the arrays that are added, () for single numbers
+    k - the size of the top level, larger is more accurate. Default: 128
+
+    Missing values (nan) are kept but ignored by quantile().
+    """
+
+    def __init__(self, shape=(), k=128):
+        self.shape = tuple(shape)
+        self.k = k
+
+        # levels[h] is a list of arrays of shape self.shape, each standing for 2^h values
+        self.levels = [[]]
+
+        # Which half of a sorted level moves up alternates between compactions
+        self.num_compactions = 0
+
+    # The number of values a level can hold before it is compacted, lower levels hold fewer
+    def __capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    # Compacts every level that is full, starting from the bottom
+    def __compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) >= self.__capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+
+                items = np.sort(np.stack(self.levels[level]), axis=0)
+                num_paired = len(items) - len(items) % 2
+
+                self.levels[level + 1].extend(items[self.num_compactions % 2:num_paired:2])
+                self.levels[level] = list(items[num_paired:])
+                self.num_compactions += 1
+
+            level += 1
+
+    # Adds an array of shape self.shape
+    def add(self, values):
+        self.levels[0].append(np.asarray(values, dtype=np.float64))
+        self.__compress()
+
+    # Adds everything in another sketch of the same shape to this one
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append([])
+            self.levels[level].extend(items)
+
+        self.num_compactions += other.num_compactions
+        self.__compress()
+
+    # Returns the estimated q-quantile (q in [0, 1]) of each element, nan where nothing has been added
+    def quantile(self, q):
+        values = [item for items in self.levels for item in items]
+        if not values:
+            return np.full(self.shape, np.nan)
+
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        weights = weights.reshape((-1,) + (1,) * len(self.shape))
+
+        # Sort each element's values (nan goes last) and find where the running weight reaches q of the total
+        values = np.stack(values)
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        sorted_weights = np.where(np.isnan(sorted_values), 0, np.take_along_axis(np.broadcast_to(weights, values.shape),
+                                                                                 order, axis=0))
+        cumulative_weights = np.cumsum(sorted_weights, axis=0)
+        total_weights = cumulative_weights[-1]
+
+        position = np.argmax(cumulative_weights >= q * total_weights, axis=0)
+        quantiles = np.take_along_axis(sorted_values, position[None], axis=0)[0]
+
+        return np.where(total_weights > 0, quantiles, np.nan)
+
+
+class RunningStatistics:
+    """
+    The count, mean, variance, min and max of arrays added one at a time, kept elementwise with Welford's algorithm so
+    memory doesn't grow with the number of arrays. Two RunningStatistics can be merged, giving the same result as if
+    everything had been added to one of them.
+
+    shape - the shape of the arrays that are added, () for single numbers
+    quantiles - whether to also keep a QuantileSketch for estimating medians and other quantiles. Default: False
+    k - the accuracy of the QuantileSketch
+
+    Missing values (None or nan) are skipped, so each element has its own count.
+    """
+
+    def __init__(self, shape=(), quantiles=False, k=128):
+        self.shape = tuple(shape)
+
+        self.count = np.zeros(self.shape, dtype=np.int64)
+        self.mean = np.zeros(self.shape)
+        self.m2 = np.zeros(self.shape)  # The sum of squared differences from the mean
+        self.minimum = np.full(self.shape, np.inf)
+        self.maximum = np.full(self.shape, -np.inf)
+
+        self.sketch = QuantileSketch(self.shape, k) if quantiles else None
+
+    # Adds an array of shape self.shape
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+
+        self.count += present
+        delta = np.where(present, values - self.mean, 0)
+        self.mean += np.divide(delta, self.count, out=np.zeros(self.shape), where=present)
+        self.m2 += np.where(present, delta * (values - self.mean), 0)
+
+        self.minimum = np.fmin(self.minimum, values)
+        self.maximum = np.fmax(self.maximum, values)
+
+        if self.sketch is not None:
+            self.sketch.add(values)
+
+    # Adds everything in another RunningStatistics of the same shape to this one
+    def merge(self, other):
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        has_any = count > 0
+
+        self.mean = self.mean + np.divide(delta * other.count, count, out=np.zeros(self.shape), where=has_any)
+        self.m2 = self.m2 + other.m2 + np.divide(delta ** 2 * self.count * other.count, count, out=np.zeros(self.shape),
+                                                 where=has_any)
+        self.count = count
+
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+
+    # The sample variance, nan where fewer than two values were added
+    @property
+    def variance(self):
+        return np.divide(self.m2, self.count - 1, out=np.full(self.shape, np.nan), where=self.count > 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    # The standard error of the mean
+    @property
+    def standard_error(self):
+        return np.divide(self.std, np.sqrt(self.count), out=np.full(self.shape, np.nan), where=self.count > 0)
+
+    # Returns the estimated q-quantile (q in [0, 1]), needs quantiles=True
+    def quantile(self, q):
+        if self.sketch is None:
+            raise ValueError("Quantiles were not kept, use quantiles=True")
+
+        return self.sketch.quantile(q)
+
+
+class EnsembleStatistics:
+    """
+    RunningStatistics for every statistic of many simulations, in the layout of
+    simulation_analysis_funcs.get_empty_analysis_dicts. Memory doesn't grow with the number of simulations, and
+    ensemble workers can each keep their own and merge them afterwards.
+
+    final_day[dict_name][key] - the RunningStatistics of each statistic's last computed value
+    curves[dict_name][key] - the RunningStatistics of each statistic over every day, as an array of shape
+                             (num_days,) or (num_days, ...) for the distributions. Days without a value are skipped
+
+    quantiles, k - whether to keep quantile sketches, see RunningStatistics
+
+    Statistics have to be numbers or arrays of numbers (None counts as missing).
+    """
+
+    def __init__(self, quantiles=False, k=128):
+        self.quantiles = quantiles
+        self.k = k
+
+        self.num_runs = 0
+        self.final_day = dict()
+        self.curves = dict()
+
+    # Adds values[dict_name][key] to statistics[dict_name][key], making the RunningStatistics the first time
+    def __add(self, statistics, values):
+        for dict_name, dict_values in values.items():
+            dict_statistics = statistics.setdefault(dict_name, dict())
+
+            for key, value in dict_values.items():
+                value = np.asarray(value, dtype=np.float64)
+                if key not in dict_statistics:
+                    dict_statistics[key] = RunningStatistics(value.shape, self.quantiles, self.k)
+                dict_statistics[key].add(value)
+
+    # Adds one run's statistics
+    # final_day_statistics - see ensemble_funcs.get_final_day_statistics
+    # daily_curves - the run's statistics over every day, see ensemble_funcs.get_daily_curves (optional)
+    def add_run(self, final_day_statistics, daily_curves=None):
+        self.num_runs += 1
+
+        self.__add(self.final_day, final_day_statistics)
+        if daily_curves is not None:
+            self.__add(self.curves, daily_curves)
+
+    # Adds everything from another EnsembleStatistics
+    def merge(self, other):
+        self.num_runs += other.num_runs
+
+        for statistics, other_statistics in ((self.final_day, other.final_day), (self.curves, other.curves)):
+            for dict_name, other_dict_statistics in other_statistics.items():
+                dict_statistics = statistics.setdefault(dict_name, dict())
+
+                for key, running_statistics in other_dict_statistics.items():
+                    if key in dict_statistics:
+                        dict_statistics[key].merge(running_statistics)
+                    else:
+                        dict_statistics[key] = copy.deepcopy(running_statistics)